@@ -1,11 +1,54 @@
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import functools
+import gzip
+import hashlib
+import heapq
+import itertools
 import random
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Tuple, Optional
+from dataclasses import asdict, dataclass, field, fields
+from concurrent.futures import (FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed, wait)
+import sys
+import math
+import os
+import sqlite3
+import threading
 import time
+import unicodedata
+import uuid
+import zlib
+from array import array
+from collections import OrderedDict, deque
 import re
+from urllib.parse import parse_qsl, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for the batch (population-scale) code paths
+    np = None
+
+def _require_numpy(feature: str):
+    if np is None:
+        raise ImportError(f"NumPy is required for {feature} (pip install numpy)")
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # PyArrow is only needed for the Parquet / Arrow export sinks
+    pa = pq = None
+
+def _require_pyarrow(feature: str):
+    if pa is None:
+        raise ImportError(f"PyArrow is required for {feature} (pip install pyarrow)")
 
 
 # CONFIGURATION - INSERT YOUR API KEY HERE
@@ -16,6 +59,18 @@ NEWS_API_KEY = "INSERT YOUR API KEY HERE"  # <- INSERT YOUR API KEY HERE
 NEWS_API_BASE = "https://newsapi.org/v2"
 REDDIT_API_BASE = "https://www.reddit.com"
 
+# Optional on-disk response cache so restarted processes start warm (empty = memory only)
+RESPONSE_CACHE_PATH = ""
+
+# Optional JSON interest graph replacing the built-in relations (empty = built-in only)
+INTEREST_GRAPH_PATH = ""
+
+
+# Canonical category levels, in code order, for the batch code paths
+ACTIVITY_LEVELS = ("low", "moderate", "high")
+TECH_SAVVINESS_LEVELS = ("low", "average", "high")
+EDUCATION_LEVELS = ("high_school", "college", "graduate", "other")
+
 
 # DATA CLASSES
 
@@ -34,6 +89,9 @@ class Character:
     tech_savviness: str = "average"  # low, average, high
     social_connectivity: int = 50  # 0-100 representing social network size
     education_level: str = "college"  # high_school, college, graduate, other
+    # Identity for per-user state such as collaborative history; names need not be unique.
+    # Not part of equality or repr, so characters with the same profile still compare equal
+    user_id: str = field(default_factory=lambda: uuid.uuid4().hex, compare=False, repr=False)
 
 @dataclass
 class Recommendation:
@@ -46,100 +104,1568 @@ class Recommendation:
     description: str = ""
     published_at: str = ""
 
+@dataclass
+class FeedResult:
+    """A generated feed plus metadata about how it was assembled"""
+    recommendations: List[Recommendation]
+    cut_branches: List[str] = field(default_factory=list)  # Algorithms with a source that missed the deadline
+    hedged_branches: List[str] = field(default_factory=list)  # Algorithms that sent a duplicate request
+    elapsed: float = 0.0
+
+
+# POPULATION TABLES
+
+
+class _Vocabulary:
+    """Interns strings to dense integer codes, in first-seen order"""
+    
+    __slots__ = ("values", "index")
+    
+    def __init__(self, seed: Tuple[str, ...] = ()):
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+        for value in seed:
+            self.code(value)
+    
+    def code(self, value: str) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+class CharacterRow:
+    """Lightweight view of one row of a CharacterTable, read like a Character"""
+    
+    __slots__ = ("_table", "_index")
+    
+    def __init__(self, table: "CharacterTable", index: int):
+        self._table = table
+        self._index = index
+    
+    def __getattr__(self, name: str):
+        if name in CharacterTable.FIELDS:
+            return self._table.value(name, self._index)
+        raise AttributeError(name)
+    
+    def to_character(self) -> Character:
+        return Character(**{name: self._table.value(name, self._index) for name in CharacterTable.FIELDS})
+    
+    def __repr__(self) -> str:
+        return f"CharacterRow({self._index}, name={self.name!r})"
+
+class CharacterTable:
+    """
+    Columnar store for a population of characters
+    Categoricals are integer codes into per-column vocabularies, and interests/traits are
+    CSR-style id arrays into interned vocabularies with per-row offsets
+    """
+    
+    FIELDS = ("name", "age", "gender", "location", "occupation", "interests", "personality_traits",
+              "activity_level", "tech_savviness", "social_connectivity", "education_level", "user_id")
+    
+    # Canonical levels are interned first so their codes line up with the batch inference rules
+    CATEGORICALS = {
+        "gender": (),
+        "location": (),
+        "occupation": (),
+        "activity_level": ACTIVITY_LEVELS,
+        "tech_savviness": TECH_SAVVINESS_LEVELS,
+        "education_level": EDUCATION_LEVELS
+    }
+    
+    def __init__(self, names: List[str], age: "np.ndarray", social_connectivity: "np.ndarray",
+                 codes: Dict[str, "np.ndarray"], categories: Dict[str, List[str]],
+                 interest_vocab: List[str], interest_ids: "np.ndarray", interest_offsets: "np.ndarray",
+                 trait_vocab: List[str], trait_ids: "np.ndarray", trait_offsets: "np.ndarray",
+                 user_ids: Optional[List[str]] = None):
+        self.names = names
+        self.user_ids = user_ids if user_ids is not None else [uuid.uuid4().hex for _ in names]
+        self.age = age
+        self.social_connectivity = social_connectivity
+        self.codes = codes
+        self.categories = categories
+        self.interest_vocab = interest_vocab
+        self.interest_ids = interest_ids
+        self.interest_offsets = interest_offsets
+        self.trait_vocab = trait_vocab
+        self.trait_ids = trait_ids
+        self.trait_offsets = trait_offsets
+    
+    @classmethod
+    def from_characters(cls, characters: List[Character]) -> "CharacterTable":
+        """Build a table from Character objects"""
+        _require_numpy("CharacterTable")
+        vocabularies = {column: _Vocabulary(levels) for column, levels in cls.CATEGORICALS.items()}
+        codes = {column: [] for column in cls.CATEGORICALS}
+        interests, traits = _Vocabulary(), _Vocabulary()
+        interest_ids, trait_ids = [], []
+        interest_offsets, trait_offsets = [0], [0]
+        
+        for character in characters:
+            for column, vocabulary in vocabularies.items():
+                codes[column].append(vocabulary.code(getattr(character, column)))
+            interest_ids.extend(interests.code(interest) for interest in character.interests)
+            interest_offsets.append(len(interest_ids))
+            trait_ids.extend(traits.code(trait) for trait in character.personality_traits)
+            trait_offsets.append(len(trait_ids))
+        
+        return cls(
+            names=[character.name for character in characters],
+            user_ids=[character.user_id for character in characters],
+            age=np.fromiter((c.age for c in characters), dtype=np.int32, count=len(characters)),
+            social_connectivity=np.fromiter((c.social_connectivity for c in characters), dtype=np.int32,
+                                            count=len(characters)),
+            codes={column: np.asarray(values, dtype=np.int32) for column, values in codes.items()},
+            categories={column: vocabulary.values for column, vocabulary in vocabularies.items()},
+            interest_vocab=interests.values,
+            interest_ids=np.asarray(interest_ids, dtype=np.int32),
+            interest_offsets=np.asarray(interest_offsets, dtype=np.int64),
+            trait_vocab=traits.values,
+            trait_ids=np.asarray(trait_ids, dtype=np.int32),
+            trait_offsets=np.asarray(trait_offsets, dtype=np.int64)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __getitem__(self, index: int) -> CharacterRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return CharacterRow(self, index)
+    
+    def __iter__(self):
+        return (CharacterRow(self, index) for index in range(len(self)))
+    
+    def value(self, field_name: str, index: int):
+        """Decode a single field of a single row"""
+        if field_name == "name":
+            return self.names[index]
+        if field_name == "user_id":
+            return self.user_ids[index]
+        if field_name == "age":
+            return int(self.age[index])
+        if field_name == "social_connectivity":
+            return int(self.social_connectivity[index])
+        if field_name == "interests":
+            start, end = self.interest_offsets[index], self.interest_offsets[index + 1]
+            return [self.interest_vocab[i] for i in self.interest_ids[start:end]]
+        if field_name == "personality_traits":
+            start, end = self.trait_offsets[index], self.trait_offsets[index + 1]
+            return [self.trait_vocab[i] for i in self.trait_ids[start:end]]
+        return self.categories[field_name][self.codes[field_name][index]]
+    
+    def to_characters(self) -> List[Character]:
+        """Convert every row back into a Character"""
+        return [row.to_character() for row in self]
+    
+    def inference_columns(self) -> Dict[str, "np.ndarray"]:
+        """Columns for RecommendationInferenceEngine.infer_algorithms_batch, without decoding any strings"""
+        non_empty = {column: np.fromiter((bool(value) for value in self.categories[column]), dtype=bool)
+                     for column in ("location", "occupation")}
+        return {
+            "age": self.age,
+            "social_connectivity": self.social_connectivity,
+            "num_interests": np.diff(self.interest_offsets),
+            "num_traits": np.diff(self.trait_offsets),
+            "activity_level": self.codes["activity_level"],
+            "tech_savviness": self.codes["tech_savviness"],
+            "education_level": self.codes["education_level"],
+            "has_location": non_empty["location"][self.codes["location"]],
+            "has_occupation": non_empty["occupation"][self.codes["occupation"]]
+        }
+    
+    def nbytes(self) -> int:
+        """Approximate memory held by the numeric columns"""
+        arrays = [self.age, self.social_connectivity, self.interest_ids, self.interest_offsets,
+                  self.trait_ids, self.trait_offsets, *self.codes.values()]
+        return sum(array.nbytes for array in arrays)
+
+
+# METRICS
+
+
+class MetricsSink:
+    """
+    Destination for timings and counters recorded on the hot paths
+    This base sink drops everything; instrumented code checks `enabled` first so it costs one attribute read
+    """
+    
+    enabled = False
+    
+    def observe(self, name: str, value: float, labels: Tuple[Tuple[str, str], ...] = ()):
+        """Record one sample (seconds, for timings) into the histogram called name"""
+    
+    def increment(self, name: str, amount: float = 1, labels: Tuple[Tuple[str, str], ...] = ()):
+        """Add amount to the counter called name"""
+
+class _Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+    
+    __slots__ = ("bounds", "counts", "total", "count")
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.total = 0.0
+        self.count = 0
+    
+    def add(self, value: float):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+    
+    def cumulative(self) -> List[int]:
+        running, out = 0, []
+        for count in self.counts:
+            running += count
+            out.append(running)
+        return out
+
+class MetricsRegistry(MetricsSink):
+    """In-memory sink: latency histograms and counters keyed by name and labels, dumpable as Prometheus text"""
+    
+    enabled = True
+    
+    # Upper bounds (seconds) of the histogram buckets; everything slower lands in +Inf
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._histograms: Dict[str, Dict[Tuple, _Histogram]] = {}
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, name: str, value: float, labels: Tuple[Tuple[str, str], ...] = ()):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = _Histogram(self.buckets)
+            histogram.add(value)
+    
+    def increment(self, name: str, amount: float = 1, labels: Tuple[Tuple[str, str], ...] = ()):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + amount
+    
+    def counter(self, name: str, **labels: str) -> float:
+        """Current value of one counter series"""
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+    
+    def reset(self):
+        """Drop every recorded series"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """Plain-dict copy of every series: counters by value, histograms by count, sum and mean"""
+        with self._lock:
+            counters = {name: {_format_labels(labels): value for labels, value in series.items()}
+                        for name, series in self._counters.items()}
+            histograms = {
+                name: {_format_labels(labels): {"count": h.count, "sum": h.total,
+                                                "mean": h.total / h.count if h.count else 0.0}
+                       for labels, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+    
+    def to_prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+            for name in sorted(self._histograms):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    for bound, count in zip(histogram.bounds, histogram.cumulative()):
+                        le = labels + (("le", f"{bound:g}"),)
+                        lines.append(f"{name}_bucket{_format_labels(le)} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total:g}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+_metrics_sink: MetricsSink = MetricsSink()
+
+def get_metrics_sink() -> MetricsSink:
+    """Return the process-wide metrics sink (a no-op sink unless metrics were enabled)"""
+    return _metrics_sink
+
+def set_metrics_sink(sink: Optional[MetricsSink]) -> MetricsSink:
+    """Install a sink for every instrumented code path; None restores the no-op sink"""
+    global _metrics_sink
+    _metrics_sink = sink if sink is not None else MetricsSink()
+    return _metrics_sink
+
+def enable_metrics() -> MetricsRegistry:
+    """Start recording into a fresh in-memory registry and return it"""
+    return set_metrics_sink(MetricsRegistry())
+
+class _Span:
+    """Times a with-block into a histogram, labelled with whether it raised"""
+    
+    __slots__ = ("sink", "name", "labels", "start")
+    
+    def __init__(self, sink: MetricsSink, name: str, labels: Tuple[Tuple[str, str], ...]):
+        self.sink = sink
+        self.name = name
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "ok" if exc_type is None else "error"
+        self.sink.observe(self.name, time.perf_counter() - self.start, self.labels + (("outcome", outcome),))
+        return False
+
+_NULL_SPAN = contextlib.nullcontext()
+
+def span(name: str, **labels: str):
+    """Context manager timing its block into the histogram called name; a shared no-op when metrics are off"""
+    sink = _metrics_sink
+    if not sink.enabled:
+        return _NULL_SPAN
+    return _Span(sink, name, tuple(sorted(labels.items())))
+
+def count(name: str, amount: float = 1, **labels: str):
+    """Add to a counter when metrics are enabled"""
+    sink = _metrics_sink
+    if sink.enabled:
+        sink.increment(name, amount, tuple(sorted(labels.items())))
+
+def timed(name: str, **labels: str):
+    """Decorator timing every call into the histogram called name"""
+    fixed = tuple(sorted(labels.items()))
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            sink = _metrics_sink
+            if not sink.enabled:
+                return fn(*args, **kwargs)
+            with _Span(sink, name, fixed):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def timed_method(name: str):
+    """Decorator timing an API client method into the histogram called name, labelled by client and method"""
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            sink = _metrics_sink
+            if not sink.enabled:
+                return method(self, *args, **kwargs)
+            with _Span(sink, name, (("client", self.name), ("method", method.__name__))):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# RANDOM STREAMS
+
+
+class RandomStreams:
+    """
+    Tree of independent, reproducible random streams derived from one root seed
+    child(i) depends only on the root seed and the path of indices, never on call order,
+    so character i gets the same stream whichever worker or shard processes it
+    """
+    
+    def __init__(self, seed: Optional[int] = None, path: Tuple[int, ...] = ()):
+        # A random root is drawn (and kept, so the run can be repeated) when none is given
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(63)
+        self.path = path
+    
+    def child(self, *index: int) -> "RandomStreams":
+        """Stream for one character, worker or shard, independent of its siblings"""
+        return RandomStreams(self.seed, self.path + index)
+    
+    def spawn(self, n: int) -> List["RandomStreams"]:
+        """n independent children, as SeedSequence.spawn would produce"""
+        return [self.child(i) for i in range(n)]
+    
+    def seed_sequence(self) -> "np.random.SeedSequence":
+        _require_numpy("NumPy random streams")
+        return np.random.SeedSequence(self.seed, spawn_key=self.path)
+    
+    def python(self) -> random.Random:
+        """random.Random for the scalar code paths (scores, shuffles, per-character noise)"""
+        if np is not None:
+            return random.Random(int(self.seed_sequence().generate_state(2, np.uint64)[0]))
+        # Without NumPy, seed from the textual path: str seeds hash deterministically
+        return random.Random(f"{self.seed}/{'/'.join(map(str, self.path))}")
+    
+    def numpy(self) -> "np.random.Generator":
+        """NumPy Generator for the vectorized code paths"""
+        return np.random.default_rng(self.seed_sequence())
+
+
+# RATE LIMITING
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations instead of blocking"""
+    
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate  # Tokens added per second
+        self.capacity = capacity  # Burst size
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Take one token and return how many seconds the caller must wait before using it"""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            # A negative balance is a queue of callers; each waits for its own share of refill
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+class RateLimiter:
+    """Per-host token buckets shared by every thread and asyncio task using the same limiter"""
+    
+    # Requests per second and burst size, by host
+    DEFAULT_LIMITS = {
+        "www.reddit.com": (1.0, 5)
+    }
+    
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.limits = dict(self.DEFAULT_LIMITS if limits is None else limits)
+        self.clock = clock  # Shared by every host's bucket
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+    
+    def set_limit(self, host: str, rate: float, burst: float):
+        """Configure (or reconfigure) the budget for a host"""
+        with self._lock:
+            self.limits[host] = (rate, burst)
+            self._buckets.pop(host, None)
+    
+    def _reserve(self, host: str) -> float:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                if host not in self.limits:
+                    return 0.0
+                bucket = self._buckets[host] = TokenBucket(*self.limits[host], clock=self.clock)
+        wait = bucket.reserve()
+        with self._lock:
+            stats = self._stats.setdefault(host, {"requests": 0, "delayed": 0, "total_wait": 0.0,
+                                                  "max_wait": 0.0})
+            stats["requests"] += 1
+            if wait > 0:
+                stats["delayed"] += 1
+                stats["total_wait"] += wait
+                stats["max_wait"] = max(stats["max_wait"], wait)
+        return wait
+    
+    def acquire(self, host: str) -> float:
+        """Block the calling thread only if the host's budget is exhausted; returns the wait"""
+        wait = self._reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    async def acquire_async(self, host: str) -> float:
+        """Asyncio variant of acquire that yields to the event loop while waiting"""
+        wait = self._reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return request counts and wait-time totals per host"""
+        with self._lock:
+            return {host: dict(values) for host, values in self._stats.items()}
+
+
+# HTTP TRANSPORT
+
+# Seconds the current request spent waiting in the client (rate limiter, retry backoff), so its
+# latency can exclude them
+RATE_LIMIT_WAIT = contextvars.ContextVar("rate_limit_wait", default=0.0)
+
+class HTTPTransport:
+    """
+    Shared HTTP layer holding one keep-alive connection pool per host
+    Responses with a retryable status are retried here rather than in the adapter, so every
+    attempt takes its own rate-limiter token; a 429 waits as long as its Retry-After asks
+    """
+    
+    RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+    
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 16, max_retries: int = 2,
+                 backoff_factor: float = 0.3, timeout: float = 5,
+                 rate_limiter: Optional[RateLimiter] = None, max_retry_after: float = 30.0):
+        self.rate_limiter = rate_limiter  # Applied per host before every attempt
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize  # Should be at least the number of concurrent fetch threads
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_retry_after = max_retry_after  # A longer Retry-After hands the response back instead
+        # The adapter only retries connections that failed before anything reached the host
+        self.retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=False,
+            backoff_factor=backoff_factor,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=False
+        )
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: Optional[float] = None) -> requests.Response:
+        """Issue a GET request over the pooled session for the URL's host, retrying retryable statuses"""
+        host = urlsplit(url).netloc
+        session = self._session_for(host)
+        waited = 0.0
+        for attempt in itertools.count():
+            if self.rate_limiter is not None:
+                waited += self.rate_limiter.acquire(host)
+            response = session.get(url, params=params, headers=headers,
+                                   timeout=self.timeout if timeout is None else timeout)
+            delay = self._retry_delay(response, attempt)
+            if delay is None:
+                break
+            response.close()
+            time.sleep(delay)
+            waited += delay
+        RATE_LIMIT_WAIT.set(waited)
+        return response
+    
+    def _retry_delay(self, response: requests.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying response, or None to hand it back as the final answer"""
+        if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+            return None
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                delay = self.retry.parse_retry_after(retry_after)
+            except Exception:
+                delay = None  # Malformed header: fall back to backoff
+            if delay is not None:
+                return delay if delay <= self.max_retry_after else None
+        return self.backoff_factor * 2 ** attempt
+    
+    def _session_for(self, host: str) -> requests.Session:
+        """Return the session for a host, creating its connection pool on first use"""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                                      pool_maxsize=self.pool_maxsize, max_retries=self.retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return session
+    
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+_default_transport: Optional[HTTPTransport] = None
+_default_transport_lock = threading.Lock()
+
+def get_default_transport() -> HTTPTransport:
+    """Return the process-wide transport shared by clients that are not given one"""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = HTTPTransport(rate_limiter=RateLimiter())
+        return _default_transport
+
+class RecordedResponse:
+    """Minimal stand-in for requests.Response, built from a recording"""
+    
+    def __init__(self, status_code: int, content: bytes):
+        self.status_code = status_code
+        self.content = content
+    
+    def json(self):
+        return json.loads(self.content)
+
+class RecordReplayTransport:
+    """
+    Transport that records upstream responses to a JSONL file, or replays them with no network
+    Recordings are keyed by URL path and parameters, so they replay against any base URL
+    """
+    
+    # Parameters that change from run to run and must not affect matching
+    VOLATILE_PARAMS = ("from",)
+    
+    def __init__(self, path: str, mode: str = "replay", inner: Optional[HTTPTransport] = None,
+                 strict: bool = False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode must be 'record' or 'replay', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.inner = inner or get_default_transport()
+        self.strict = strict  # In replay mode, raise on unrecorded requests instead of answering 404
+        self._recordings: Optional[Dict[str, Tuple[int, str]]] = None
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def request_key(cls, url: str, params: Optional[Dict]) -> str:
+        normalized = sorted((str(k), str(v)) for k, v in (params or {}).items() if k not in cls.VOLATILE_PARAMS)
+        return json.dumps([urlsplit(url).path, normalized])
+    
+    @staticmethod
+    def load(path: str) -> Dict[str, Tuple[int, str]]:
+        """Read a recording file into {request key: (status, body)}; later entries win"""
+        recordings = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        recordings[entry["key"]] = (entry["status"], entry["body"])
+        except FileNotFoundError:
+            pass
+        return recordings
+    
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: Optional[float] = None):
+        key = self.request_key(url, params)
+        if self.mode == "replay":
+            with self._lock:
+                if self._recordings is None:
+                    self._recordings = self.load(self.path)
+                recorded = self._recordings.get(key)
+            if recorded is None:
+                if self.strict:
+                    raise KeyError(f"No recording for {url} {params}")
+                return RecordedResponse(404, b"{}")
+            status, body = recorded
+            return RecordedResponse(status, body.encode("utf-8"))
+        
+        response = self.inner.get(url, params=params, headers=headers, timeout=timeout)
+        entry = {"key": key, "url": url, "params": params, "status": response.status_code,
+                 "body": response.content.decode("utf-8", errors="replace")}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        return response
+
+
+# RESPONSE CACHE
+
+
+class SQLiteCacheBackend:
+    """Persistent response store in a SQLite file, compacted by a background thread"""
+    
+    def __init__(self, path: str, compact_interval: float = 300, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.compact_interval = compact_interval
+        self.clock = clock  # Wall-clock seconds, compared with the stored expiry times
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use; the caller must hold the lock"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT, value TEXT, expires_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_expiry ON responses (expires_at)")
+            self._conn.commit()
+            if self.compact_interval > 0:
+                self._compactor = threading.Thread(target=self._compact_loop, name="cache-compactor",
+                                                   daemon=True)
+                self._compactor.start()
+        return self._conn
+    
+    @staticmethod
+    def _encode_key(key: Tuple) -> str:
+        return json.dumps(key)
+    
+    def get(self, key: Tuple) -> Optional[Tuple[object, float]]:
+        """Return (value, expires_at) for an unexpired entry, or None"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                (self._encode_key(key), self.clock())
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+    
+    def set(self, key: Tuple, value: object, endpoint: str, expires_at: float):
+        """Insert or replace an entry"""
+        encoded = json.dumps(value, default=str)
+        with self._lock:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                         (self._encode_key(key), endpoint, encoded, expires_at))
+            conn.commit()
+    
+    def compact(self) -> int:
+        """Delete expired entries and return how many were removed"""
+        with self._lock:
+            conn = self._connection()
+            removed = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (self.clock(),)).rowcount
+            conn.commit()
+        return removed
+    
+    def _compact_loop(self):
+        while not self._stop.wait(self.compact_interval):
+            try:
+                self.compact()
+            except sqlite3.Error as e:
+                print(f"Cache compaction failed: {e}")
+    
+    def close(self):
+        """Stop the compactor and close the database"""
+        self._stop.set()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class ResponseCache:
+    """Thread-safe in-process cache of API responses with per-endpoint TTLs and LRU eviction"""
+    
+    # Seconds a response stays fresh, by endpoint
+    DEFAULT_TTLS = {
+        "everything": 600,
+        "top-headlines": 300,
+        "hot": 120
+    }
+    
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024,
+                 ttls: Optional[Dict[str, float]] = None, default_ttl: float = 60,
+                 backend: Optional[SQLiteCacheBackend] = None, clock: Callable[[], float] = time.time):
+        self.backend = backend  # Optional persistent tier consulted on memory misses
+        self.clock = clock  # Wall-clock seconds; expiry times are absolute so they survive in the backend
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Tuple, Tuple[object, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    @staticmethod
+    def make_key(client: str, endpoint: str, url: str, params: Optional[Dict]) -> Tuple:
+        """Build a cache key from the client, endpoint and order-independent request parameters"""
+        normalized = tuple(sorted((str(k), str(v).strip().lower()) for k, v in (params or {}).items()))
+        return (client, endpoint, url.lower(), normalized)
+    
+    def get(self, key: Tuple) -> Optional[object]:
+        """Return a fresh cached value and mark it as recently used, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    count("cache_lookups_total", result="hit")
+                    return value
+                # Expired entries stay until evicted or replaced so get_stale can still serve them
+                self.expirations += 1
+        
+        # Memory miss: lazily pull the entry from the persistent tier if there is one
+        if self.backend is not None:
+            try:
+                stored = self.backend.get(key)
+            except sqlite3.Error as e:
+                print(f"Persistent cache read failed: {e}")
+                stored = None
+            if stored is not None:
+                value, expires_at = stored
+                self._store(key, value, expires_at, len(json.dumps(value, default=str)))
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                count("cache_lookups_total", result="disk_hit")
+                return value
+        
+        with self._lock:
+            self.misses += 1
+        count("cache_lookups_total", result="miss")
+        return None
+    
+    def get_stale(self, key: Tuple) -> Optional[object]:
+        """Return a cached value even if it has expired, for use when upstream is unavailable"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.stale_hits += 1
+        count("cache_lookups_total", result="stale")
+        return entry[0]
+    
+    def set(self, key: Tuple, value: object, endpoint: str, size: Optional[int] = None):
+        """Store a value under the endpoint's TTL, evicting least recently used entries to fit"""
+        if size is None:
+            size = len(json.dumps(value, default=str))
+        expires_at = self.clock() + self.ttls.get(endpoint, self.default_ttl)
+        self._store(key, value, expires_at, size)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, endpoint, expires_at)
+            except sqlite3.Error as e:
+                print(f"Persistent cache write failed: {e}")
+    
+    def _store(self, key: Tuple, value: object, expires_at: float, size: int):
+        """Insert into the memory tier and evict down to the entry and byte bounds"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def _remove(self, key: Tuple):
+        """Drop an entry; the caller must hold the lock"""
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+    
+    def clear(self):
+        """Drop every entry, keeping the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss/eviction counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "stale_hits": self.stale_hits,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache() -> ResponseCache:
+    """Return the process-wide response cache shared by recommenders that are not given one"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            backend = SQLiteCacheBackend(RESPONSE_CACHE_PATH) if RESPONSE_CACHE_PATH else None
+            _default_cache = ResponseCache(backend=backend)
+        return _default_cache
+
+
+# CIRCUIT BREAKERS
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while an endpoint's circuit is open"""
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a sliding window of recent calls
+    Failures and calls slower than slow_call_seconds both count against the endpoint
+    """
+    
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+    
+    def __init__(self, failure_rate: float = 0.5, min_calls: int = 4, window: int = 20,
+                 open_seconds: float = 30, slow_call_seconds: float = 3.0, half_open_probes: int = 1):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.half_open_probes = half_open_probes
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)  # True for a healthy call
+        self._latencies = deque(maxlen=window)
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """Whether a request may go upstream now; in half-open state only a few probes pass"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = self.HALF_OPEN
+                self._probes_in_flight = 0
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+    
+    def record(self, success: bool, latency: float):
+        """Record the outcome of a call that allow() let through"""
+        healthy = success and latency < self.slow_call_seconds
+        with self._lock:
+            self._latencies.append(latency)
+            if self.state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if healthy:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip()
+                return
+            self._outcomes.append(healthy)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._trip()
+    
+    def _trip(self):
+        """Open the circuit; the caller must hold the lock"""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._outcomes.clear()
+    
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "state": self.state,
+                "recent_failures": self._outcomes.count(False),
+                "recent_calls": len(self._outcomes),
+                "rejected": self.rejected,
+                "p50_latency": latencies[len(latencies) // 2] if latencies else 0.0
+            }
+
+class CircuitBreakerRegistry:
+    """One breaker per endpoint name, created on first use with shared settings"""
+    
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(**self.settings)
+            return breaker
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.stats() for name, breaker in breakers.items()}
+
+# Shared by every recommender in the process so an outage is detected once
+DEFAULT_CIRCUIT_BREAKERS = CircuitBreakerRegistry()
+
+
+# LOCATION RESOLUTION
+
+# Country code -> (region, country names and aliases, states/provinces/nations, major cities)
+LocationTable = Dict[str, Tuple[str, Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]]
+
+DEFAULT_LOCATION_TABLE: LocationTable = {
+    "us": ("NA", ("United States", "United States of America", "USA", "US", "U.S.", "U.S.A.", "America"),
+           ("Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado", "Connecticut", "Delaware",
+            "Florida", "Georgia", "Hawaii", "Idaho", "Illinois", "Indiana", "Iowa", "Kansas", "Kentucky",
+            "Louisiana", "Maine", "Maryland", "Massachusetts", "Michigan", "Minnesota", "Mississippi",
+            "Missouri", "Montana", "Nebraska", "Nevada", "New Hampshire", "New Jersey", "New Mexico",
+            "New York State", "North Carolina", "North Dakota", "Ohio", "Oklahoma", "Oregon", "Pennsylvania",
+            "Rhode Island", "South Carolina", "South Dakota", "Tennessee", "Texas", "Utah", "Vermont",
+            "Virginia", "Washington State", "West Virginia", "Wisconsin", "Wyoming", "District of Columbia"),
+           ("New York", "New York City", "NYC", "Los Angeles", "San Francisco", "Chicago", "Houston",
+            "Phoenix", "Philadelphia", "San Antonio", "San Diego", "Dallas", "Austin", "San Jose", "Seattle",
+            "Denver", "Boston", "Atlanta", "Miami", "Washington DC", "Washington D.C.", "Portland",
+            "Las Vegas", "Detroit", "Minneapolis", "Nashville", "New Orleans", "Pittsburgh", "Baltimore",
+            "Salt Lake City", "Honolulu", "Brooklyn", "Silicon Valley", "Orlando", "Tampa", "Charlotte",
+            "St. Louis", "Kansas City", "Cleveland", "Cincinnati", "Milwaukee", "Sacramento", "Oakland")),
+    "ca": ("NA", ("Canada",),
+           ("Ontario", "Quebec", "British Columbia", "Alberta", "Manitoba", "Saskatchewan", "Nova Scotia",
+            "New Brunswick", "Newfoundland", "Prince Edward Island", "Yukon", "Nunavut",
+            "Northwest Territories"),
+           ("Toronto", "Montreal", "Vancouver", "Calgary", "Edmonton", "Ottawa", "Winnipeg", "Quebec City",
+            "Hamilton", "Halifax", "Mississauga")),
+    "mx": ("LATAM", ("Mexico", "Mexican"),
+           ("Jalisco", "Nuevo Leon", "Yucatan", "Baja California", "Oaxaca", "Quintana Roo"),
+           ("Mexico City", "Ciudad de Mexico", "CDMX", "Guadalajara", "Monterrey", "Puebla", "Tijuana",
+            "Cancun", "Merida")),
+    "gb": ("EU", ("United Kingdom", "UK", "U.K.", "Great Britain", "Britain", "GB"),
+           ("England", "Scotland", "Wales", "Northern Ireland"),
+           ("London", "Manchester", "Birmingham", "Liverpool", "Leeds", "Glasgow", "Edinburgh", "Bristol",
+            "Cardiff", "Belfast", "Newcastle", "Sheffield", "Nottingham", "Oxford", "Cambridge", "Brighton")),
+    "ie": ("EU", ("Ireland", "Republic of Ireland", "Eire"), (),
+           ("Dublin", "Cork", "Galway", "Limerick")),
+    "de": ("EU", ("Germany", "Deutschland"),
+           ("Bavaria", "Bayern", "Saxony", "Hesse", "North Rhine-Westphalia"),
+           ("Berlin", "Munich", "Munchen", "Hamburg", "Frankfurt", "Cologne", "Koln", "Stuttgart",
+            "Dusseldorf", "Leipzig", "Dresden", "Hanover", "Nuremberg", "Bonn")),
+    "fr": ("EU", ("France",), ("Brittany", "Normandy", "Provence", "Ile-de-France"),
+           ("Paris", "Marseille", "Lyon", "Toulouse", "Nice", "Nantes", "Strasbourg", "Bordeaux", "Lille")),
+    "es": ("EU", ("Spain", "Espana"), ("Catalonia", "Catalunya", "Andalusia", "Galicia", "Basque Country"),
+           ("Madrid", "Barcelona", "Valencia", "Seville", "Sevilla", "Bilbao", "Malaga", "Zaragoza")),
+    "pt": ("EU", ("Portugal",), (), ("Lisbon", "Lisboa", "Porto", "Braga", "Coimbra")),
+    "it": ("EU", ("Italy", "Italia"), ("Lombardy", "Tuscany", "Sicily", "Sardinia"),
+           ("Rome", "Roma", "Milan", "Milano", "Naples", "Napoli", "Turin", "Torino", "Florence", "Firenze",
+            "Venice", "Bologna", "Genoa", "Palermo")),
+    "nl": ("EU", ("Netherlands", "The Netherlands", "Holland"), (),
+           ("Amsterdam", "Rotterdam", "The Hague", "Utrecht", "Eindhoven", "Groningen")),
+    "be": ("EU", ("Belgium",), ("Flanders", "Wallonia"),
+           ("Brussels", "Antwerp", "Ghent", "Bruges", "Liege")),
+    "ch": ("EU", ("Switzerland",), (), ("Zurich", "Geneva", "Basel", "Bern", "Lausanne")),
+    "at": ("EU", ("Austria", "Osterreich"), (), ("Vienna", "Wien", "Salzburg", "Innsbruck", "Graz")),
+    "se": ("EU", ("Sweden", "Sverige"), (), ("Stockholm", "Gothenburg", "Malmo", "Uppsala")),
+    "no": ("EU", ("Norway", "Norge"), (), ("Oslo", "Bergen", "Trondheim", "Stavanger")),
+    "pl": ("EU", ("Poland", "Polska"), (), ("Warsaw", "Krakow", "Lodz", "Wroclaw", "Poznan", "Gdansk")),
+    "cz": ("EU", ("Czech Republic", "Czechia"), (), ("Prague", "Brno", "Ostrava")),
+    "sk": ("EU", ("Slovakia",), (), ("Bratislava", "Kosice")),
+    "si": ("EU", ("Slovenia",), (), ("Ljubljana", "Maribor")),
+    "hu": ("EU", ("Hungary",), (), ("Budapest", "Debrecen")),
+    "ro": ("EU", ("Romania",), (), ("Bucharest", "Cluj-Napoca", "Timisoara", "Iasi")),
+    "bg": ("EU", ("Bulgaria",), (), ("Sofia", "Plovdiv", "Varna")),
+    "rs": ("EU", ("Serbia",), (), ("Belgrade", "Novi Sad")),
+    "gr": ("EU", ("Greece",), ("Crete",), ("Athens", "Thessaloniki", "Patras")),
+    "lt": ("EU", ("Lithuania",), (), ("Vilnius", "Kaunas")),
+    "lv": ("EU", ("Latvia",), (), ("Riga",)),
+    "ua": ("EU", ("Ukraine",), (), ("Kyiv", "Kiev", "Kharkiv", "Odesa", "Odessa", "Lviv")),
+    "ru": ("EU", ("Russia", "Russian Federation"), (),
+           ("Moscow", "Saint Petersburg", "St. Petersburg", "Novosibirsk", "Kazan")),
+    "tr": ("MEA", ("Turkey", "Turkiye"), (), ("Istanbul", "Ankara", "Izmir", "Antalya")),
+    "il": ("MEA", ("Israel",), (), ("Tel Aviv", "Jerusalem", "Haifa")),
+    "ae": ("MEA", ("United Arab Emirates", "UAE", "U.A.E.", "Emirates"), (), ("Dubai", "Abu Dhabi", "Sharjah")),
+    "sa": ("MEA", ("Saudi Arabia", "KSA"), (), ("Riyadh", "Jeddah", "Mecca", "Medina", "Dammam")),
+    "eg": ("MEA", ("Egypt",), (), ("Cairo", "Alexandria", "Giza")),
+    "ma": ("MEA", ("Morocco",), (), ("Casablanca", "Rabat", "Marrakesh", "Marrakech", "Fez", "Tangier")),
+    "ng": ("MEA", ("Nigeria",), (), ("Lagos", "Abuja", "Kano", "Ibadan")),
+    "za": ("MEA", ("South Africa", "RSA"), ("Gauteng", "Western Cape", "KwaZulu-Natal"),
+           ("Johannesburg", "Cape Town", "Durban", "Pretoria", "Port Elizabeth")),
+    "in": ("APAC", ("India", "Bharat"),
+           ("Maharashtra", "Karnataka", "Tamil Nadu", "Kerala", "Gujarat", "Punjab", "Rajasthan",
+            "Uttar Pradesh", "West Bengal", "Telangana"),
+           ("Mumbai", "Bombay", "Delhi", "New Delhi", "Bangalore", "Bengaluru", "Hyderabad", "Chennai",
+            "Madras", "Kolkata", "Calcutta", "Pune", "Ahmedabad", "Jaipur", "Lucknow")),
+    "cn": ("APAC", ("China", "People's Republic of China", "PRC"), ("Guangdong", "Sichuan", "Zhejiang"),
+           ("Beijing", "Shanghai", "Guangzhou", "Shenzhen", "Chengdu", "Wuhan", "Hangzhou", "Xi'an",
+            "Nanjing", "Tianjin")),
+    "hk": ("APAC", ("Hong Kong",), (), ("Kowloon",)),
+    "tw": ("APAC", ("Taiwan",), (), ("Taipei", "Kaohsiung", "Taichung")),
+    "jp": ("APAC", ("Japan", "Nippon"), ("Hokkaido", "Okinawa"),
+           ("Tokyo", "Osaka", "Kyoto", "Yokohama", "Nagoya", "Sapporo", "Fukuoka", "Kobe", "Hiroshima")),
+    "kr": ("APAC", ("South Korea", "Korea", "Republic of Korea"), (),
+           ("Seoul", "Busan", "Incheon", "Daegu")),
+    "sg": ("APAC", ("Singapore",), (), ()),
+    "my": ("APAC", ("Malaysia",), (), ("Kuala Lumpur", "Penang", "Johor Bahru")),
+    "th": ("APAC", ("Thailand",), (), ("Bangkok", "Chiang Mai", "Phuket", "Pattaya")),
+    "id": ("APAC", ("Indonesia",), ("Bali", "Java", "Sumatra"), ("Jakarta", "Surabaya", "Bandung")),
+    "ph": ("APAC", ("Philippines",), (), ("Manila", "Quezon City", "Cebu", "Davao")),
+    "au": ("APAC", ("Australia",),
+           ("New South Wales", "Victoria", "Queensland", "Western Australia", "South Australia", "Tasmania",
+            "Northern Territory"),
+           ("Sydney", "Melbourne", "Brisbane", "Perth", "Adelaide", "Canberra", "Hobart", "Darwin",
+            "Gold Coast")),
+    "nz": ("APAC", ("New Zealand", "Aotearoa"), (),
+           ("Auckland", "Wellington", "Christchurch", "Queenstown")),
+    "br": ("LATAM", ("Brazil", "Brasil"), ("Bahia", "Minas Gerais"),
+           ("Sao Paulo", "Rio de Janeiro", "Rio", "Brasilia", "Salvador", "Fortaleza", "Belo Horizonte",
+            "Recife", "Porto Alegre", "Curitiba")),
+    "ar": ("LATAM", ("Argentina",), ("Patagonia",), ("Buenos Aires", "Cordoba", "Rosario", "Mendoza")),
+    "co": ("LATAM", ("Colombia",), (), ("Bogota", "Medellin", "Cali", "Cartagena", "Barranquilla")),
+    "ve": ("LATAM", ("Venezuela",), (), ("Caracas", "Maracaibo")),
+    "cu": ("LATAM", ("Cuba",), (), ("Havana", "La Habana")),
+}
+
+# Longer names that contain a table name but are not in its country; they match nothing
+LOCATION_BLOCKED_NAMES = (
+    "North America", "South America", "Latin America", "Central America", "Americas", "New England",
+    "North Korea", "Rio Grande"
+)
+
+# Table names that are also ordinary words; they only count when capitalized ("somewhere nice" is not Nice)
+LOCATION_COMMON_WORDS = (
+    "Nice", "Cork", "Java", "Phoenix", "Darwin", "Mecca", "Rio", "Georgia", "Victoria", "Austin",
+    "Charlotte", "Florence", "Salvador", "Medina", "Cali", "Hamilton", "Bali", "Wien"
+)
+
+# Preferred when several names match: "Paris, Texas" is in the US, "Sydney, Australia" needs no city
+LOCATION_KIND_RANK = {"country": 0, "subdivision": 1, "city": 2}
+
+@dataclass(frozen=True)
+class ResolvedLocation:
+    """Country and region a free-text location resolved to, and the name that decided it"""
+    country: str
+    region: str
+    matched: str
+    kind: str
+
+class LocationResolver:
+    """
+    Resolves free-text locations against a compiled table of country, subdivision and city names.
+    Every name is compiled once into an Aho-Corasick automaton over normalized text, so a location
+    is matched against the whole table in one pass; matches must sit on word boundaries, a match
+    contained in a longer one is discarded ("New Mexico" is not Mexico, "New South Wales" is not
+    Wales), and of the rest a country beats a subdivision beats a city, then longer, then later wins.
+    Blocked names only shadow what they contain ("South America" is not the US); common words
+    must be capitalized to count.
+    """
+    
+    def __init__(self, table: Optional[LocationTable] = None, blocked: Iterable[str] = LOCATION_BLOCKED_NAMES,
+                 common_words: Iterable[str] = LOCATION_COMMON_WORDS, cache_size: int = 65536):
+        table = DEFAULT_LOCATION_TABLE if table is None else table
+        self.common_words = frozenset(self.normalize(word) for word in common_words)
+        self.entries: List[ResolvedLocation] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        terminal: Dict[int, int] = {}
+        # Blocked names go first so no table entry can claim them
+        groups = [("", "", "blocked", tuple(blocked))]
+        for country, (region, names, subdivisions, cities) in table.items():
+            groups += [(country, region, "country", names), (country, region, "subdivision", subdivisions),
+                       (country, region, "city", cities)]
+        for country, region, kind, group in groups:
+            for name in group:
+                pattern = self.normalize(name)
+                if pattern:
+                    state = self._insert(pattern)
+                    # The first definition of a name wins ("Victoria" stays Australian)
+                    if state not in terminal:
+                        terminal[state] = len(self.entries)
+                        self.entries.append(ResolvedLocation(country, region, pattern, kind))
+        self._link(terminal)
+        self.resolve = functools.lru_cache(maxsize=cache_size)(self._resolve)
+    
+    @staticmethod
+    def plain(text: str) -> str:
+        """Drop accents and collapse punctuation to single spaces, keeping case ("Zürich" -> "Zurich")"""
+        decomposed = unicodedata.normalize("NFKD", text)
+        return " ".join(re.findall(r"[A-Za-z0-9]+", "".join(c for c in decomposed if not unicodedata.combining(c))))
+    
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """plain() lowercased: the form names are compiled and matched in"""
+        return cls.plain(text).lower()
+    
+    def _insert(self, pattern: str) -> int:
+        state = 0
+        for char in pattern:
+            following = self._goto[state].get(char)
+            if following is None:
+                following = self._goto[state][char] = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = following
+        return state
+    
+    def _link(self, terminal: Dict[int, int]):
+        """Breadth-first failure links; each state outputs every name ending there, longest first"""
+        for state, entry in terminal.items():
+            self._outputs[state] = (entry,)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self._outputs[state] = self._outputs[state] + self._outputs[self._fail[state]]
+            for char, following in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[following] = self._goto[fallback].get(char, 0)
+                queue.append(following)
+    
+    def matches(self, location: str) -> List[Tuple[int, int, ResolvedLocation]]:
+        """All table names in the location on word boundaries, as (start, end, entry) over normalized text"""
+        original = self.plain(location)
+        text = original.lower()  # Same length as original, so positions carry over
+        found = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if end < len(text) and text[end] != " ":
+                continue
+            for index in self._outputs[state]:
+                entry = self.entries[index]
+                start = end - len(entry.matched)
+                if start > 0 and text[start - 1] != " ":
+                    continue
+                if entry.matched in self.common_words and not original[start].isupper():
+                    continue
+                found.append((start, end, entry))
+        return found
+    
+    def _resolve(self, location: str) -> Optional[ResolvedLocation]:
+        found = self.matches(location)
+        kept = [(start, end, entry) for start, end, entry in found
+                if not any(other_start <= start and end <= other_end and other_end - other_start > end - start
+                           for other_start, other_end, _ in found)
+                and entry.kind != "blocked"]
+        if not kept:
+            return None
+        best = min(kept, key=lambda match: (LOCATION_KIND_RANK[match[2].kind], match[0] - match[1], -match[0]))
+        return best[2]
+    
+    def country(self, location: str, default: str = "us") -> str:
+        """Country code of a location, or default when nothing in it is recognized"""
+        resolved = self.resolve(location) if location else None
+        return resolved.country if resolved else default
+    
+    def stats(self) -> Dict[str, int]:
+        info = self.resolve.cache_info()
+        return {"names": len(self.entries), "states": len(self._goto), "cache_hits": info.hits,
+                "cache_misses": info.misses, "cache_size": info.currsize}
+
+_default_location_resolver: Optional[LocationResolver] = None
+_default_location_resolver_lock = threading.Lock()
+
+def get_default_location_resolver() -> LocationResolver:
+    """Return the process-wide location resolver, compiling the built-in table on first use"""
+    global _default_location_resolver
+    with _default_location_resolver_lock:
+        if _default_location_resolver is None:
+            _default_location_resolver = LocationResolver()
+        return _default_location_resolver
+
 
 # API CLIENTS
 
 
-class NewsAPIClient:
+class APIResponseError(Exception):
+    """Raised when an API answers with a non-200 status"""
+    
+    def __init__(self, url: str, status_code: int):
+        super().__init__(f"HTTP {status_code} from {url}")
+        self.url = url
+        self.status_code = status_code
+
+class CacheMissError(Exception):
+    """Raised in cache-only mode when a response is not cached"""
+
+# How the current call may reach upstream: "normal", "cache_only" (deadline fallback),
+# or "hedge" (duplicate request that must not join the original's in-flight call)
+REQUEST_MODE = contextvars.ContextVar("request_mode", default="normal")
+
+class BatchScope:
+    """
+    Request settings for one batch: a common page size, so requests that differ only in their
+    limit share one response, and every response fetched in the batch, held until it ends
+    """
+    
+    def __init__(self, page_size: Optional[int] = None):
+        self.page_size = page_size
+        self.responses: Dict[Tuple, Dict] = {}
+
+# Set by BatchFeedPlanner while it prefetches and assembles feeds; other callers never see it
+BATCH_SCOPE = contextvars.ContextVar("batch_scope", default=None)
+
+def run_in_mode(mode: str, fn: Callable, *args):
+    """Call fn(*args) with REQUEST_MODE set to mode"""
+    token = REQUEST_MODE.set(mode)
+    try:
+        return fn(*args)
+    finally:
+        REQUEST_MODE.reset(token)
+
+def _fan_out(executor: Optional[Executor], fn: Callable, items: List, *args) -> List:
+    """Call fn(item, *args) for every item, concurrently when an executor is available"""
+    if executor is None or len(items) <= 1:
+        return [fn(item, *args) for item in items]
+    # Carry the caller's request mode over to the worker threads
+    futures = [executor.submit(contextvars.copy_context().run, fn, item, *args) for item in items]
+    return [future.result() for future in futures]
+
+class _InFlightCall:
+    """Result slot for one in-flight SingleFlight call"""
+    
+    __slots__ = ("done", "result", "error")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single call whose outcome all callers share"""
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0  # Callers served by another caller's request
+    
+    def do(self, key: Hashable, fn: Callable):
+        """Run fn() unless a call for key is already running, in which case wait for its outcome"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _InFlightCall()
+                self.calls += 1
+            else:
+                self.shared += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+# Shared by every recommender in the process so concurrent feeds coalesce their fetches
+DEFAULT_SINGLE_FLIGHT = SingleFlight()
+
+class BaseAPIClient:
+    """Request path shared by the API clients: response cache, request coalescing, then pooled transport"""
+    
+    name = "base"
+    
+    def __init__(self, headers: Dict[str, str], executor: Optional[Executor] = None,
+                 transport: Optional[HTTPTransport] = None, cache: Optional[ResponseCache] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None):
+        self.headers = headers
+        self.transport = transport or get_default_transport()
+        self.cache = cache
+        self.single_flight = single_flight
+        self.breakers = breakers
+        self.executor = executor  # Used to issue per-query requests in parallel
+        # When set, every request asks for at least this many items and callers slice locally,
+        # so requests that differ only in their limit share one cache entry
+        self.page_size: Optional[int] = None
+    
+    def _page_size(self, limit: int) -> int:
+        batch = BATCH_SCOPE.get()
+        page_size = max(self.page_size or 0, batch.page_size or 0 if batch is not None else 0)
+        return max(limit, page_size) if page_size else limit
+    
+    def _fetch_json(self, endpoint: str, url: str, params: Dict) -> Dict:
+        """GET a JSON document, serving it from the current batch or the cache while fresh"""
+        key = ResponseCache.make_key(self.name, endpoint, url, params)
+        batch = BATCH_SCOPE.get()
+        if batch is None:
+            return self._fetch_cached(key, endpoint, url, params)
+        data = batch.responses.get(key)
+        if data is None:
+            data = batch.responses[key] = self._fetch_cached(key, endpoint, url, params)
+        return data
+    
+    def _fetch_cached(self, key: Tuple, endpoint: str, url: str, params: Dict) -> Dict:
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        mode = REQUEST_MODE.get()
+        breaker = self.breakers.get(f"{self.name}/{endpoint}") if self.breakers is not None else None
+        if mode == "cache_only" or (breaker is not None and not breaker.allow()):
+            # Fail fast: an expired response beats waiting on an endpoint that is down or too slow
+            stale = self.cache.get_stale(key) if self.cache is not None else None
+            if stale is not None:
+                return stale
+            if mode == "cache_only":
+                raise CacheMissError(f"no cached response for {url}")
+            raise CircuitOpenError(f"circuit open for {self.name}/{endpoint}")
+        
+        # Only the caller that goes upstream reports to the breaker; coalesced callers share its outcome
+        request = lambda: self._request(key, endpoint, url, params, breaker)
+        if self.single_flight is not None and mode != "hedge":
+            return self.single_flight.do(key, request)
+        return request()
+    
+    @staticmethod
+    def _guarded(breaker: CircuitBreaker, send: Callable):
+        """
+        Run send() and report its outcome and latency to the endpoint's breaker
+        Time spent queued in the rate limiter is not the endpoint's latency and is left out
+        """
+        token = RATE_LIMIT_WAIT.set(0.0)
+        start = time.monotonic()
+        upstream_seconds = lambda: max(0.0, time.monotonic() - start - RATE_LIMIT_WAIT.get())
+        try:
+            result = send()
+        except APIResponseError as e:
+            # Client errors (bad subreddit, bad key) say nothing about the endpoint's health
+            breaker.record(e.status_code < 500 and e.status_code != 429, upstream_seconds())
+            raise
+        except Exception:
+            breaker.record(False, upstream_seconds())
+            raise
+        else:
+            breaker.record(True, upstream_seconds())
+            return result
+        finally:
+            RATE_LIMIT_WAIT.reset(token)
+    
+    def _request(self, key: Tuple, endpoint: str, url: str, params: Dict,
+                 breaker: Optional[CircuitBreaker] = None) -> Dict:
+        """Send the request upstream and cache a successful response"""
+        send = lambda: self._send(endpoint, url, params)
+        data, size = self._guarded(breaker, send) if breaker is not None else send()
+        
+        if self.cache is not None:
+            self.cache.set(key, data, endpoint, size=size)
+        return data
+    
+    def _send(self, endpoint: str, url: str, params: Dict) -> Tuple[Dict, int]:
+        """GET the URL and return the decoded JSON with its size in bytes"""
+        with span("upstream_request_seconds", client=self.name, endpoint=endpoint):
+            response = self.transport.get(url, params=params, headers=self.headers)
+        count("upstream_requests_total", client=self.name, endpoint=endpoint, status=str(response.status_code))
+        if response.status_code != 200:
+            raise APIResponseError(url, response.status_code)
+        return response.json(), len(response.content)
+
+class NewsAPIClient(BaseAPIClient):
     """Client for fetching news from NewsAPI"""
     
-    def __init__(self, api_key: str):
+    name = "newsapi"
+    
+    def __init__(self, api_key: str, executor: Optional[Executor] = None,
+                 transport: Optional[HTTPTransport] = None, cache: Optional[ResponseCache] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None, base_url: str = NEWS_API_BASE,
+                 location_resolver: Optional[LocationResolver] = None):
+        super().__init__({"X-Api-Key": api_key}, executor, transport, cache, single_flight, breakers)
         self.api_key = api_key
-        self.headers = {"X-Api-Key": api_key}
+        self.base_url = base_url
+        self._location_resolver = location_resolver
+    
+    @property
+    def location_resolver(self) -> LocationResolver:
+        """The resolver given at construction, else the shared one (compiled on first use)"""
+        if self._location_resolver is None:
+            self._location_resolver = get_default_location_resolver()
+        return self._location_resolver
     
+    @timed_method("client_method_seconds")
     def fetch_by_interests(self, interests: List[str], limit: int = 5) -> List[Dict]:
         """Fetch news articles based on interests"""
-        if not self.api_key or self.api_key == "YOUR_NEWS_API_KEY_HERE":
+        if not self._has_api_key():
             return self._get_placeholder_news("interests", interests)
         
         articles = []
-        for interest in interests[:2]:  # Limit to 2 interests to avoid rate limits
-            try:
-                url = f"{NEWS_API_BASE}/everything"
-                params = {
-                    "q": interest,
-                    "sortBy": "relevancy",
-                    "pageSize": limit,
-                    "language": "en",
-                    "from": (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-                }
-                response = requests.get(url, params=params, headers=self.headers, timeout=5)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    articles.extend(data.get("articles", [])[:limit])
-                else:
-                    print(f"NewsAPI error for interest '{interest}': {response.status_code}")
-            except Exception as e:
-                print(f"NewsAPI request failed for interest '{interest}': {e}")
+        # Limit to 2 interests to avoid rate limits
+        for interest_articles in _fan_out(self.executor, self._fetch_interest, interests[:2], limit):
+            articles.extend(interest_articles)
         
         return articles if articles else self._get_placeholder_news("interests", interests)
     
-    def fetch_by_location(self, location: str, limit: int = 5) -> List[Dict]:
-        """Fetch news articles based on location"""
-        if not self.api_key or self.api_key == "YOUR_NEWS_API_KEY_HERE":
-            return self._get_placeholder_news("location", [location])
-        
+    def _fetch_interest(self, interest: str, limit: int) -> List[Dict]:
+        """Fetch news articles for a single interest"""
         try:
-            # Map location to country code (simplified)
-            country_codes = {
-                "USA": "us", "United States": "us", "UK": "gb", "United Kingdom": "gb",
-                "Canada": "ca", "Australia": "au", "Germany": "de", "France": "fr", 
-                "Japan": "jp", "India": "in", "Italy": "it", "Spain": "es",
-                "Netherlands": "nl", "Brazil": "br", "Mexico": "mx"
+            url = f"{self.base_url}/everything"
+            params = {
+                "q": interest,
+                "sortBy": "relevancy",
+                "pageSize": self._page_size(limit),
+                "language": "en",
+                "from": (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
             }
-            
-            # Extract country from location string
-            country_found = None
-            for country_name, code in country_codes.items():
-                if country_name.lower() in location.lower():
-                    country_found = code
-                    break
-            
-            country = country_found or "us"  # Default to US
-            
-            url = f"{NEWS_API_BASE}/top-headlines"
-            params = {"country": country, "pageSize": limit}
-            response = requests.get(url, params=params, headers=self.headers, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("articles", [])[:limit]
+            data = self._fetch_json("everything", url, params)
+            return data.get("articles", [])[:limit]
+        except APIResponseError as e:
+            print(f"NewsAPI error for interest '{interest}': {e.status_code}")
+        except (CacheMissError, CircuitOpenError):
+            pass  # Failing fast with nothing cached: use placeholder content
         except Exception as e:
-            print(f"NewsAPI request failed for location '{location}': {e}")
+            print(f"NewsAPI request failed for interest '{interest}': {e}")
+        
+        return []
+    
+    @timed_method("client_method_seconds")
+    def fetch_by_location(self, location: str, limit: int = 5) -> List[Dict]:
+        """Fetch news articles based on location"""
+        if not self._has_api_key():
+            return self._get_placeholder_news("location", [location])
         
-        return self._get_placeholder_news("location", [location])
+        articles = self._fetch_headlines(self.country_for_location(location), limit, f"location '{location}'")
+        return articles if articles is not None else self._get_placeholder_news("location", [location])
     
+    @timed_method("client_method_seconds")
     def fetch_trending(self, limit: int = 5) -> List[Dict]:
         """Fetch trending/popular news"""
-        if not self.api_key or self.api_key == "YOUR_NEWS_API_KEY_HERE":
+        if not self._has_api_key():
             return self._get_placeholder_news("trending", [])
         
+        articles = self._fetch_headlines("us", limit, "trending")
+        return articles if articles is not None else self._get_placeholder_news("trending", [])
+    
+    def country_for_location(self, location: str) -> str:
+        """Map a free-text location to a NewsAPI country code"""
+        return self.location_resolver.country(location, default="us")
+    
+    def _fetch_headlines(self, country: str, limit: int, context: str) -> Optional[List[Dict]]:
+        """Fetch top headlines for a country, or None if the request failed"""
         try:
-            url = f"{NEWS_API_BASE}/top-headlines"
-            params = {"country": "us", "pageSize": limit}
-            response = requests.get(url, params=params, headers=self.headers, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("articles", [])[:limit]
+            url = f"{self.base_url}/top-headlines"
+            params = {"country": country, "pageSize": self._page_size(limit)}
+            data = self._fetch_json("top-headlines", url, params)
+            return data.get("articles", [])[:limit]
+        except (CacheMissError, CircuitOpenError):
+            pass  # Failing fast with nothing cached: use placeholder content
         except Exception as e:
-            print(f"NewsAPI trending request failed: {e}")
-        
-        return self._get_placeholder_news("trending", [])
+            print(f"NewsAPI request failed for {context}: {e}")
+        return None
+    
+    def _has_api_key(self) -> bool:
+        return bool(self.api_key) and self.api_key != "YOUR_NEWS_API_KEY_HERE"
     
     def _get_placeholder_news(self, type_: str, context: List[str]) -> List[Dict]:
         """Generate placeholder news when API is unavailable"""
+        count("placeholder_fallbacks_total", client=self.name, kind=type_)
         placeholders = {
             "interests": [
                 {"title": f"Breaking: Major developments in {context[0] if context else 'technology'}",
@@ -166,83 +1692,83 @@ class NewsAPIClient:
         }
         return placeholders.get(type_, placeholders["trending"])
 
-class RedditClient:
+class RedditClient(BaseAPIClient):
     """Client for fetching content from Reddit's public API"""
     
-    def __init__(self):
-        self.headers = {"User-Agent": "RecommendationSystem/1.0"}
+    name = "reddit"
+    
+    # Map interests to subreddits
+    SUBREDDIT_MAP = {
+        "technology": "technology", "gaming": "gaming", "sports": "sports",
+        "music": "music", "art": "art", "science": "science",
+        "food": "food", "travel": "travel", "fitness": "fitness",
+        "movies": "movies", "books": "books", "photography": "photography",
+        "programming": "programming", "ai": "MachineLearning", "fashion": "fashion",
+        "business": "business", "finance": "finance", "cooking": "cooking",
+        "health": "health", "psychology": "psychology", "history": "history",
+        "politics": "politics", "environment": "environment", "space": "space"
+    }
+    
+    def __init__(self, executor: Optional[Executor] = None, transport: Optional[HTTPTransport] = None,
+                 cache: Optional[ResponseCache] = None, single_flight: Optional[SingleFlight] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None, base_url: str = REDDIT_API_BASE):
+        super().__init__({"User-Agent": "RecommendationSystem/1.0"}, executor, transport, cache,
+                         single_flight, breakers)
+        self.base_url = base_url
     
+    @timed_method("client_method_seconds")
     def fetch_by_interests(self, interests: List[str], limit: int = 5) -> List[Dict]:
         """Fetch Reddit posts based on interests"""
         posts = []
         
-        # Map interests to subreddits
-        subreddit_map = {
-            "technology": "technology", "gaming": "gaming", "sports": "sports",
-            "music": "music", "art": "art", "science": "science",
-            "food": "food", "travel": "travel", "fitness": "fitness",
-            "movies": "movies", "books": "books", "photography": "photography",
-            "programming": "programming", "ai": "MachineLearning", "fashion": "fashion",
-            "business": "business", "finance": "finance", "cooking": "cooking",
-            "health": "health", "psychology": "psychology", "history": "history",
-            "politics": "politics", "environment": "environment", "space": "space"
-        }
-        
-        for interest in interests[:2]:  # Limit requests
-            subreddit = subreddit_map.get(interest.lower(), interest.lower())
-            try:
-                url = f"{REDDIT_API_BASE}/r/{subreddit}/hot.json"
-                params = {"limit": limit}
-                response = requests.get(url, params=params, headers=self.headers, timeout=5)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    for child in data.get("data", {}).get("children", [])[:limit]:
-                        post = child.get("data", {})
-                        posts.append({
-                            "title": post.get("title", ""),
-                            "subreddit": post.get("subreddit", ""),
-                            "url": f"https://reddit.com{post.get('permalink', '')}",
-                            "score": post.get("score", 0),
-                            "created": post.get("created_utc", 0)
-                        })
-                else:
-                    print(f"Reddit error for subreddit '{subreddit}': {response.status_code}")
-                
-                time.sleep(1)  # Rate limiting
-                
-            except Exception as e:
-                print(f"Reddit request failed for interest '{interest}': {e}")
+        # Limit requests
+        for interest_posts in _fan_out(self.executor, self._fetch_interest, interests[:2], limit):
+            posts.extend(interest_posts)
         
         return posts if posts else self._get_placeholder_reddit("interests", interests)
     
+    @timed_method("client_method_seconds")
     def fetch_trending(self, limit: int = 5) -> List[Dict]:
         """Fetch trending posts from Reddit"""
+        posts = self._fetch_subreddit("popular", limit)
+        return posts if posts is not None else self._get_placeholder_reddit("trending", [])
+    
+    def subreddit_for(self, interest: str) -> str:
+        """Map an interest to the subreddit that covers it"""
+        return self.SUBREDDIT_MAP.get(interest.lower(), interest.lower())
+    
+    def _fetch_interest(self, interest: str, limit: int) -> List[Dict]:
+        """Fetch hot posts from the subreddit matching a single interest"""
+        return self._fetch_subreddit(self.subreddit_for(interest), limit) or []
+    
+    def _fetch_subreddit(self, subreddit: str, limit: int) -> Optional[List[Dict]]:
+        """Fetch hot posts from one subreddit, or None if the request failed"""
         try:
-            url = f"{REDDIT_API_BASE}/r/popular/hot.json"
-            params = {"limit": limit}
-            response = requests.get(url, params=params, headers=self.headers, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                posts = []
-                for child in data.get("data", {}).get("children", [])[:limit]:
-                    post = child.get("data", {})
-                    posts.append({
-                        "title": post.get("title", ""),
-                        "subreddit": post.get("subreddit", ""),
-                        "url": f"https://reddit.com{post.get('permalink', '')}",
-                        "score": post.get("score", 0),
-                        "created": post.get("created_utc", 0)
-                    })
-                return posts
+            url = f"{self.base_url}/r/{subreddit}/hot.json"
+            params = {"limit": self._page_size(limit)}
+            data = self._fetch_json("hot", url, params)
+            posts = []
+            for child in data.get("data", {}).get("children", [])[:limit]:
+                post = child.get("data", {})
+                posts.append({
+                    "title": post.get("title", ""),
+                    "subreddit": post.get("subreddit", ""),
+                    "url": f"https://reddit.com{post.get('permalink', '')}",
+                    "score": post.get("score", 0),
+                    "created": post.get("created_utc", 0)
+                })
+            return posts
+        except APIResponseError as e:
+            print(f"Reddit error for subreddit '{subreddit}': {e.status_code}")
+        except (CacheMissError, CircuitOpenError):
+            pass  # Failing fast with nothing cached: use placeholder content
         except Exception as e:
-            print(f"Reddit trending request failed: {e}")
-        
-        return self._get_placeholder_reddit("trending", [])
+            print(f"Reddit request failed for subreddit '{subreddit}': {e}")
+        return None
     
     def _get_placeholder_reddit(self, type_: str, context: List[str]) -> List[Dict]:
         """Generate placeholder Reddit content"""
+        count("placeholder_fallbacks_total", client=self.name, kind=type_)
         return [
             {"title": f"Popular discussion about {context[0] if context else 'trending topics'}",
              "subreddit": "placeholder", "url": "#", "score": 1000, "created": time.time()},
@@ -253,10 +1779,27 @@ class RedditClient:
 # RECOMMENDATION ALGORITHMS
 
 
+def _category_codes(values, levels: Tuple[str, ...]) -> "np.ndarray":
+    """Map a column of category strings (or integer codes) onto indices into levels; unknowns become -1"""
+    array = np.asarray(values)
+    if array.dtype.kind in "iu":
+        return array
+    lookup = {level: code for code, level in enumerate(levels)}
+    return np.fromiter((lookup.get(value, -1) for value in array), dtype=np.int8, count=len(array))
+
+def _normalize_rows(weights: "np.ndarray") -> "np.ndarray":
+    """Scale each row to sum to 1.0, leaving all-zero rows untouched"""
+    totals = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, totals, out=weights, where=totals > 0)
+
 class RecommendationInferenceEngine:
     """Infers which recommendation algorithms would be applied to a character"""
     
-    def __init__(self):
+    # Column order of the batch weight matrix
+    ALGORITHMS = ("content_based", "collaborative", "popularity", "demographic")
+    
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng if rng is not None else random  # Source of the noise step; the global RNG by default
         self.algorithm_weights = {
             "content_based": 0.0,
             "collaborative": 0.0,
@@ -264,6 +1807,7 @@ class RecommendationInferenceEngine:
             "demographic": 0.0
         }
     
+    @timed("inference_seconds", mode="scalar")
     def infer_algorithms(self, character: Character) -> Dict[str, float]:
         """
         Probabilistically infer which algorithms would be used based on character attributes
@@ -362,7 +1906,7 @@ class RecommendationInferenceEngine:
         
         # Add some randomness to simulate real-world variability
         for key in self.algorithm_weights:
-            noise = random.uniform(-0.05, 0.05)
+            noise = self.rng.uniform(-0.05, 0.05)
             self.algorithm_weights[key] = max(0, min(1, self.algorithm_weights[key] + noise))
         
         # Re-normalize after adding noise
@@ -371,57 +1915,955 @@ class RecommendationInferenceEngine:
             for key in self.algorithm_weights:
                 self.algorithm_weights[key] /= total_weight
         
+        count("inferences_total", mode="scalar")
         return self.algorithm_weights
+    
+    @staticmethod
+    def columns_from_characters(characters: List[Character]) -> Dict[str, "np.ndarray"]:
+        """Convert characters into the columnar input expected by infer_algorithms_batch"""
+        _require_numpy("batch inference")
+        return {
+            "age": np.fromiter((c.age for c in characters), dtype=np.float64, count=len(characters)),
+            "social_connectivity": np.fromiter((c.social_connectivity for c in characters),
+                                               dtype=np.float64, count=len(characters)),
+            "num_interests": np.fromiter((len(c.interests) for c in characters), dtype=np.int32,
+                                         count=len(characters)),
+            "num_traits": np.fromiter((len(c.personality_traits) for c in characters), dtype=np.int32,
+                                      count=len(characters)),
+            "activity_level": _category_codes([c.activity_level for c in characters], ACTIVITY_LEVELS),
+            "tech_savviness": _category_codes([c.tech_savviness for c in characters], TECH_SAVVINESS_LEVELS),
+            "education_level": _category_codes([c.education_level for c in characters], EDUCATION_LEVELS),
+            "has_location": np.fromiter((bool(c.location) for c in characters), dtype=bool,
+                                        count=len(characters)),
+            "has_occupation": np.fromiter((bool(c.occupation) for c in characters), dtype=bool,
+                                          count=len(characters))
+        }
+    
+    @timed("inference_seconds", mode="batch")
+    def infer_algorithms_batch(self, columns: Dict[str, "np.ndarray"],
+                               rng: Optional["np.random.Generator"] = None) -> "np.ndarray":
+        """
+        Vectorized infer_algorithms over a whole population given as columns
+        Returns an (n, 4) weight matrix whose columns follow ALGORITHMS; pass rng (for example
+        RandomStreams(seed).numpy()) for reproducible noise
+        """
+        _require_numpy("batch inference")
+        if rng is None:
+            rng = np.random.default_rng()
+        
+        age = np.asarray(columns["age"], dtype=np.float64)
+        social = np.asarray(columns["social_connectivity"], dtype=np.float64)
+        num_interests = np.asarray(columns["num_interests"])
+        num_traits = np.asarray(columns["num_traits"])
+        activity = _category_codes(columns["activity_level"], ACTIVITY_LEVELS)
+        tech = _category_codes(columns["tech_savviness"], TECH_SAVVINESS_LEVELS)
+        education = _category_codes(columns["education_level"], EDUCATION_LEVELS)
+        has_location = np.asarray(columns["has_location"], dtype=bool)
+        has_occupation = np.asarray(columns["has_occupation"], dtype=bool)
+        
+        low_activity, moderate_activity, high_activity = (activity == code for code in range(3))
+        low_tech, average_tech, high_tech = (tech == code for code in range(3))
+        
+        weights = np.empty((len(age), len(self.ALGORITHMS)), dtype=np.float64)
+        
+        # Same rules as infer_algorithms, one column per algorithm
+        weights[:, 0] = (np.minimum(num_interests * 0.2, 1.0) * 0.4
+                         + 0.2 * high_tech + 0.1 * average_tech
+                         + 0.15 * (high_activity & (num_interests > 3))
+                         + 0.1 * ((education == 1) | (education == 2)))
+        weights[:, 1] = (social / 100 * 0.5
+                         + 0.2 * high_activity + 0.1 * moderate_activity
+                         + 0.15 * ((age >= 25) & (age <= 45)))
+        weights[:, 2] = (np.where(age < 25, 0.4, np.where(age < 35, 0.25, 0.1))
+                         + 0.2 * low_activity + 0.15 * low_tech)
+        weights[:, 3] = (0.15 + np.where((age < 18) | (age > 65), 0.25, 0.1)
+                         + 0.15 * has_location + 0.05 + 0.1 * has_occupation
+                         + 0.1 * (num_traits > 3))
+        
+        _normalize_rows(weights)
+        count("inferences_total", len(weights), mode="batch")
+        
+        # Noise step, drawn for the whole population at once
+        weights += rng.uniform(-0.05, 0.05, size=weights.shape)
+        np.clip(weights, 0, 1, out=weights)
+        
+        return _normalize_rows(weights)
+    
+    @classmethod
+    def weights_to_dict(cls, row: "np.ndarray") -> Dict[str, float]:
+        """Turn one row of a batch weight matrix into the dict returned by infer_algorithms"""
+        return {algo: float(weight) for algo, weight in zip(cls.ALGORITHMS, row)}
+
+# DEDUPLICATION
+
+# Query parameters that identify a campaign or referrer rather than the content
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid|ocid|smid)$", re.IGNORECASE)
+
+def canonical_url(url: str) -> str:
+    """Scheme-less, www-less, lowercase-host URL without fragment, trailing slash or tracking parameters"""
+    parts = urlsplit(url.strip()) if url else None
+    if parts is None or not parts.netloc:
+        return ""  # Placeholders ("#") and relative links identify nothing
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = "&".join(f"{key}={value}" for key, value in sorted(parse_qsl(parts.query, keep_blank_values=True))
+                     if not _TRACKING_PARAMS.match(key))
+    return host + path + ("?" + query if query else "")
+
+def normalize_title(title: str) -> str:
+    """Lowercase words of a title with punctuation and extra whitespace removed"""
+    return " ".join(re.findall(r"[a-z0-9]+", title.lower()))
+
+def _key_hash(kind: str, text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(f"{kind}:{text}".encode("utf-8"), digest_size=8).digest(), "little")
+
+def recommendation_keys(rec: Recommendation) -> List[int]:
+    """64-bit identity hashes of a recommendation: its canonical URL and its normalized title"""
+    keys = []
+    url = canonical_url(rec.url)
+    if url:
+        keys.append(_key_hash("url", url))
+    title = normalize_title(rec.title)
+    if title.count(" ") >= 2:  # Titles under three words are too generic to identify an item
+        keys.append(_key_hash("title", title))
+    return keys
+
+class ExactSeenSet:
+    """Remembers every key exactly; memory grows with the number of distinct items"""
+    
+    def __init__(self):
+        self._keys = set()
+        self._lock = threading.Lock()
+    
+    def add(self, key: int) -> bool:
+        """Insert key and report whether it was already present"""
+        with self._lock:
+            if key in self._keys:
+                return True
+            self._keys.add(key)
+            return False
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic key set: never forgets a key, but reports an unseen key as
+    present with probability about error_rate once capacity keys have been added
+    """
+    
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))  # Bits
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+        self.count = 0
+    
+    def _positions(self, key: int) -> Iterator[int]:
+        # Double hashing over the two halves of the 64-bit key (Kirsch & Mitzenmacher)
+        low, high = key & 0xFFFFFFFF, (key >> 32) | 1
+        return ((low + i * high) % self.size for i in range(self.hashes))
+    
+    def add(self, key: int) -> bool:
+        """Insert key and report whether it was (probably) already present"""
+        present = True
+        with self._lock:
+            for position in self._positions(key):
+                byte, bit = divmod(position, 8)
+                if not self._bits[byte] >> bit & 1:
+                    present = False
+                    self._bits[byte] |= 1 << bit
+            if not present:
+                self.count += 1
+        return present
+    
+    def __contains__(self, key: int) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] >> (position & 7) & 1 for position in self._positions(key))
+    
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+class Deduplicator:
+    """
+    Drops recommendations whose canonical URL or normalized title has been seen before
+    Exact by default; give it a BloomFilter to dedupe a long batch or stream in bounded memory
+    """
+    
+    def __init__(self, seen: Optional[object] = None):
+        self.seen = seen if seen is not None else ExactSeenSet()  # Anything with add(key) -> bool
+        self.duplicates = 0
+    
+    def is_new(self, rec: Recommendation) -> bool:
+        """Record rec and report whether it is the first of its kind"""
+        keys = recommendation_keys(rec)
+        # Add every key, not just the first match, so later copies are caught by either one
+        seen = [self.seen.add(key) for key in keys]
+        if any(seen):
+            self.duplicates += 1
+            return False
+        return True
+    
+    def filter(self, recommendations: Iterable[Recommendation]) -> List[Recommendation]:
+        return [rec for rec in recommendations if self.is_new(rec)]
+
+# CONTENT SCORING
+
+# Score band of each algorithm; relevance is mapped into it, or a random draw when NumPy is missing
+SCORE_RANGES = {
+    "Content-Based": (0.7, 0.95),
+    "Collaborative": (0.6, 0.85),
+    "Popularity/Trending": (0.8, 1.0),
+    "Demographic": (0.65, 0.9)
+}
+
+# Algorithm name each weight key's recommendations carry
+ALGORITHM_NAMES = {
+    "content_based": "Content-Based",
+    "collaborative": "Collaborative",
+    "popularity": "Popularity/Trending",
+    "demographic": "Demographic"
+}
+
+def _segment_sums(values: "np.ndarray", indptr: "np.ndarray") -> "np.ndarray":
+    """Per-row sums of CSR data, empty rows included (np.add.reduceat alone mishandles those)"""
+    padded = np.append(values, 0.0)  # Every row start, even past the last value, is a valid index
+    sums = np.add.reduceat(padded, indptr[:-1])
+    sums[indptr[:-1] == indptr[1:]] = 0.0
+    return sums
+
+class ContentScorer:
+    """
+    Hashed TF-IDF relevance of candidate items to a character's interests
+    Tokens are hashed into n_features columns, so the vocabulary never has to be stored; document
+    frequencies accumulate across every batch scored, each distinct item counted once however
+    often it is fetched again, so IDF sharpens as more content comes in.
+    Each batch is scored against the corpus as it stood before the batch plus the batch itself,
+    and only then added to it; inside frozen() additions wait until the scope ends, so every
+    feed of a run sees the same corpus whatever order the feeds finish in.
+    A batch of candidates becomes one CSR matrix and is scored against the query in a single
+    sparse matrix-vector product
+    """
+    
+    STOPWORDS = frozenset("a an and are as at be by for from has have in is it its of on or that the this "
+                          "to was were will with".split())
+    
+    def __init__(self, n_features: int = 1 << 18):
+        _require_numpy("content scoring")
+        self.n_features = n_features
+        self.doc_freq = np.zeros(n_features, dtype=np.float64)
+        self.documents = 0
+        self._counted = BloomFilter(capacity=1_000_000)  # Items already in doc_freq
+        self._features: Dict[str, int] = {}  # Memoized token hashes
+        self._lock = threading.Lock()
+        self._frozen = 0  # Depth of nested frozen() scopes
+        self._pending: List[Tuple[List[int], "np.ndarray", "np.ndarray"]] = []  # Additions held back by frozen()
+    
+    @contextlib.contextmanager
+    def frozen(self, commit: bool = True):
+        """
+        Hold the corpus still for the scope: batches scored inside it are added when it ends,
+        or, without commit, dropped so the corpus is left exactly as it was
+        """
+        with self._lock:
+            self._frozen += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._frozen -= 1
+                if not self._frozen:
+                    pending, self._pending = self._pending, []
+                    if commit:
+                        for keys, indptr, indices in pending:
+                            self._add_documents(keys, indptr, indices)
+    
+    def _add_documents(self, keys: List[int], indptr: "np.ndarray", indices: "np.ndarray"):
+        """Count the documents not seen before towards IDF; the caller holds the lock"""
+        new = np.fromiter((not self._counted.add(key) for key in keys), dtype=bool, count=len(keys))
+        # Each (document, column) pair is unique, so this adds one per new document containing the term
+        np.add.at(self.doc_freq, indices[np.repeat(new, np.diff(indptr))], 1)
+        self.documents += int(new.sum())
+    
+    def tokenize(self, text: str) -> List[str]:
+        return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in self.STOPWORDS]
+    
+    def _feature(self, token: str) -> int:
+        feature = self._features.get(token)
+        if feature is None:
+            # crc32 rather than hash(): the same token must land in the same column in every process
+            feature = zlib.crc32(token.encode("utf-8")) % self.n_features
+            if len(self._features) < 1_000_000:
+                self._features[token] = feature
+        return feature
+    
+    def vectorize(self, texts: List[str]) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Term counts of texts as CSR (indptr, indices, counts), columns sorted within each row"""
+        rows, columns = [], []
+        for row, text in enumerate(texts):
+            for token in self.tokenize(text):
+                rows.append(row)
+                columns.append(self._feature(token))
+        # One key per (row, column) pair; np.unique sorts and counts repeats in a single call
+        keys, counts = np.unique(np.asarray(rows, dtype=np.int64) * self.n_features
+                                 + np.asarray(columns, dtype=np.int64), return_counts=True)
+        row_ids, indices = np.divmod(keys, self.n_features)
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_ids, minlength=len(texts)), out=indptr[1:])
+        return indptr, indices, counts
+    
+    def similarities(self, query: str, texts: List[str], update: bool = True) -> "np.ndarray":
+        """Cosine similarity of each text to the query; with update, texts also count towards IDF"""
+        indptr, indices, counts = self.vectorize(texts)
+        _, query_indices, query_counts = self.vectorize([query])
+        keys = [_key_hash("doc", text) for text in texts]
+        terms = np.union1d(indices, query_indices)
+        
+        with self._lock:
+            # The batch's own new documents count too, so terms shared by most candidates weigh less
+            new, batch = np.zeros(len(texts), dtype=bool), set()
+            for row, key in enumerate(keys):
+                new[row] = key not in self._counted and key not in batch
+                batch.add(key)
+            batch_freq = np.zeros(len(terms))
+            np.add.at(batch_freq, np.searchsorted(terms, indices[np.repeat(new, np.diff(indptr))]), 1)
+            idf = np.log((1 + self.documents + int(new.sum())) / (1 + self.doc_freq[terms] + batch_freq)) + 1
+            if update:
+                if self._frozen:
+                    self._pending.append((keys, indptr, indices))
+                else:
+                    self._add_documents(keys, indptr, indices)
+        
+        data = (1 + np.log(counts)) * idf[np.searchsorted(terms, indices)]
+        query_data = (1 + np.log(query_counts)) * idf[np.searchsorted(terms, query_indices)]
+        
+        query_norm = np.sqrt(query_data @ query_data)
+        if not len(data) or query_norm == 0:
+            return np.zeros(len(texts))
+        # Look up the query weight of every stored entry (query columns are sorted)
+        position = np.minimum(np.searchsorted(query_indices, indices), len(query_indices) - 1)
+        query_weights = np.where(query_indices[position] == indices, query_data[position], 0.0)
+        
+        dots = _segment_sums(data * query_weights, indptr)
+        norms = np.sqrt(_segment_sums(data * data, indptr))
+        return np.divide(dots, norms * query_norm, out=np.zeros(len(texts)), where=norms > 0)
+    
+    def score(self, character: Character, recommendations: List[Recommendation]):
+        """Replace each recommendation's score with its relevance, mapped into its algorithm's band"""
+        if not recommendations:
+            return
+        texts = [f"{rec.title} {rec.description} {rec.source.partition(' - ')[2]}" for rec in recommendations]
+        similarity = np.clip(self.similarities(" ".join(character.interests), texts), 0.0, 1.0)
+        low, high = np.array([SCORE_RANGES.get(rec.algorithm, (0.0, 1.0)) for rec in recommendations]).T
+        for rec, score in zip(recommendations, (low + (high - low) * similarity).tolist()):
+            rec.score = score
+
+# INTEREST GRAPH
+
+# Built-in relations, used when no INTEREST_GRAPH_PATH is configured
+DEFAULT_INTEREST_RELATIONS = {
+    "technology": ["programming", "gadgets", "AI"],
+    "gaming": ["esports", "gamedev", "pcgaming"],
+    "sports": ["fitness", "olympics", "soccer"],
+    "music": ["concerts", "instruments", "audio"],
+    "art": ["design", "photography", "crafts"],
+    "science": ["space", "biology", "physics"],
+    "food": ["cooking", "recipes", "restaurants"],
+    "travel": ["backpacking", "digitalnomad", "solotravel"],
+    "business": ["entrepreneur", "startups", "investing"],
+    "health": ["nutrition", "meditation", "wellness"]
+}
+
+class InterestGraph:
+    """
+    Weighted directed graph of interests in CSR arrays (offsets, targets, weights)
+    Related interests are ranked by personalized PageRank from the query interests, so they
+    reach past direct neighbours; each node's top-k list is computed once and cached, and a
+    query merges the cached lists of its interests, so lookups cost O(k) per interest
+    """
+    
+    def __init__(self, relations: Dict[str, Dict[str, float]], reverse_weight: float = 0.5,
+                 k: int = 10, alpha: float = 0.25, epsilon: float = 1e-4):
+        self.k = k
+        self.alpha = alpha  # Restart probability: higher keeps results closer to the query
+        self.epsilon = epsilon  # Residual below which the PageRank push stops
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        
+        edges: Dict[Tuple[int, int], float] = {}
+        for source, targets in relations.items():
+            for target, weight in targets.items():
+                edges[(self._node(source), self._node(target))] = float(weight)
+        # Relations are usually listed one way; let them be walked back, more weakly
+        if reverse_weight:
+            for (source, target), weight in list(edges.items()):
+                edges.setdefault((target, source), weight * reverse_weight)
+        
+        self.offsets = array("l", [0] * (len(self.names) + 1))
+        for source, _ in edges:
+            self.offsets[source + 1] += 1
+        for node in range(len(self.names)):
+            self.offsets[node + 1] += self.offsets[node]
+        self.targets = array("l", [0] * len(edges))
+        self.weights = array("d", [0.0] * len(edges))
+        fill = array("l", self.offsets[:-1])
+        # Insertion order within a row is kept, so ties rank in the order relations were listed
+        for (source, target), weight in edges.items():
+            self.targets[fill[source]] = target
+            self.weights[fill[source]] = weight
+            fill[source] += 1
+        self.out_weight = array("d", (sum(self.weights[self.offsets[node]:self.offsets[node + 1]])
+                                      for node in range(len(self.names))))
+        self._top_k: Dict[int, List[Tuple[int, float]]] = {}
+        self._lock = threading.Lock()
+    
+    def _node(self, name: str) -> int:
+        key = name.lower()
+        node = self._index.get(key)
+        if node is None:
+            node = self._index[key] = len(self.names)
+            self.names.append(name)
+        return node
+    
+    @classmethod
+    def from_relations(cls, relations: Dict[str, Iterable], **options) -> "InterestGraph":
+        """Build from {interest: {related: weight}} or {interest: [related, ...]} (weight 1)"""
+        return cls({source: targets if isinstance(targets, dict) else {target: 1.0 for target in targets}
+                    for source, targets in relations.items()}, **options)
+    
+    @classmethod
+    def load(cls, path: str, **options) -> "InterestGraph":
+        """Load a JSON file holding either relations form accepted by from_relations"""
+        with open(path, encoding="utf-8") as f:
+            return cls.from_relations(json.load(f), **options)
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def __contains__(self, interest: str) -> bool:
+        return interest.lower() in self._index
+    
+    def neighbors(self, interest: str) -> List[Tuple[str, float]]:
+        """Direct (related interest, weight) edges of an interest"""
+        node = self._index.get(interest.lower())
+        if node is None:
+            return []
+        return [(self.names[self.targets[i]], self.weights[i])
+                for i in range(self.offsets[node], self.offsets[node + 1])]
+    
+    def personalized_pagerank(self, seeds: Dict[int, float]) -> Dict[int, float]:
+        """
+        Approximate PageRank personalized to the seed nodes, by residual pushing
+        (Andersen, Chung and Lang): only nodes near the seeds are ever visited
+        """
+        total = sum(seeds.values())
+        rank: Dict[int, float] = {}
+        residual = {node: weight / total for node, weight in seeds.items()}
+        queue = deque(residual)
+        while queue:
+            node = queue.popleft()
+            mass = residual.pop(node, 0.0)
+            if mass < self.epsilon:
+                if mass:
+                    residual[node] = mass
+                continue
+            rank[node] = rank.get(node, 0.0) + self.alpha * mass
+            out_weight = self.out_weight[node]
+            if not out_weight:
+                rank[node] += (1 - self.alpha) * mass  # Dangling node keeps its mass
+                continue
+            spread = (1 - self.alpha) * mass / out_weight
+            for i in range(self.offsets[node], self.offsets[node + 1]):
+                target = self.targets[i]
+                before = residual.get(target, 0.0)
+                residual[target] = before + spread * self.weights[i]
+                if before < self.epsilon <= residual[target]:
+                    queue.append(target)
+        return rank
+    
+    def top_k(self, node: int) -> List[Tuple[int, float]]:
+        """The k highest-ranked other nodes for one node, computed on first use and cached"""
+        cached = self._top_k.get(node)
+        if cached is None:
+            rank = self.personalized_pagerank({node: 1.0})
+            rank.pop(node, None)
+            # Ties go to the lower node id, i.e. the relation listed first
+            cached = heapq.nsmallest(self.k, rank.items(), key=lambda entry: (-entry[1], entry[0]))
+            with self._lock:
+                self._top_k[node] = cached
+        return cached
+    
+    def precompute(self):
+        """Fill every node's top-k list up front, for example before forking workers"""
+        for node in range(len(self.names)):
+            self.top_k(node)
+    
+    def expand(self, interests: List[str], limit: int = 3) -> List[str]:
+        """
+        Up to limit interests related to any of interests, best first, excluding interests itself
+        Unknown interests stand for themselves, so they can still be searched for directly: each
+        takes the slot of its position in interests, and every known interest's slot takes the
+        next best related interest ("foo", "technology" -> "foo", "programming", ...)
+        """
+        own = {interest.lower() for interest in interests}
+        scores: Dict[int, float] = {}
+        for interest in interests:
+            node = self._index.get(interest.lower())
+            if node is not None:
+                for other, score in self.top_k(node):
+                    scores[other] = scores.get(other, 0.0) + score
+        ranked = iter([self.names[node] for node, _ in sorted(scores.items(), key=lambda entry: (-entry[1], entry[0]))
+                       if self.names[node].lower() not in own])
+        
+        related: List[str] = []
+        for interest in interests:
+            if interest.lower() not in self._index:
+                if interest.lower() not in (name.lower() for name in related):
+                    related.append(interest)
+            else:
+                related.extend(itertools.islice(ranked, 1))
+        related.extend(ranked)
+        return related[:limit]
+
+_default_interest_graph: Optional[InterestGraph] = None
+_default_interest_graph_lock = threading.Lock()
+
+def get_default_interest_graph() -> InterestGraph:
+    """Return the process-wide interest graph: INTEREST_GRAPH_PATH if set, the built-in relations otherwise"""
+    global _default_interest_graph
+    with _default_interest_graph_lock:
+        if _default_interest_graph is None:
+            if INTEREST_GRAPH_PATH:
+                _default_interest_graph = InterestGraph.load(INTEREST_GRAPH_PATH)
+            else:
+                _default_interest_graph = InterestGraph.from_relations(DEFAULT_INTEREST_RELATIONS)
+        return _default_interest_graph
+
+# COLLABORATIVE FILTERING
+
+class ItemItemCF:
+    """
+    Item-item collaborative filtering over implicit feedback (a user was served an item)
+    The user-item matrix is kept sparse as per-user and per-item dicts, together with item-item
+    co-occurrence counts. New interactions update the counts in place and mark the touched items
+    stale; an item's top-k cosine neighbours are recomputed only when a query next reads them.
+    A query is a lookup of the neighbour lists of the user's items, with no network access
+    """
+    
+    def __init__(self, k: int = 20, seeds_per_interest: int = 5):
+        self.k = k
+        self.seeds_per_interest = seeds_per_interest  # Cold-start seeds drawn per interest
+        self.items: List[Dict] = []  # Item id -> title, source, url, description, published_at
+        self._item_ids: Dict[int, int] = {}  # Identity key (see recommendation_keys) -> item id
+        self._user_items: Dict[str, Dict[int, None]] = {}  # Insertion-ordered item sets
+        self._item_users: List[int] = []  # Number of users per item (squared norm of its column)
+        self._cooccurrence: List[Dict[int, int]] = []
+        self._interest_items: Dict[str, Dict[int, int]] = {}  # Interest -> item -> users with both
+        self._neighbors: List[List[Tuple[float, int]]] = []
+        self._stale = set()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def _item_id(self, rec: Recommendation) -> Optional[int]:
+        if not canonical_url(rec.url):
+            return None  # Placeholder content has no stable identity
+        key = recommendation_keys(rec)[0]
+        item = self._item_ids.get(key)
+        if item is None:
+            item = self._item_ids[key] = len(self.items)
+            self.items.append({"title": rec.title, "source": rec.source, "url": rec.url,
+                               "description": rec.description, "published_at": rec.published_at})
+            self._item_users.append(0)
+            self._cooccurrence.append({})
+            self._neighbors.append([])
+        return item
+    
+    def add_interactions(self, user: str, interests: List[str], recommendations: Iterable[Recommendation]):
+        """Record that user was served these items; only pairs involving new items are touched"""
+        with self._lock:
+            history = self._user_items.setdefault(user, {})
+            for rec in recommendations:
+                item = self._item_id(rec)
+                if item is None or item in history:
+                    continue
+                self._item_users[item] += 1
+                for other in history:
+                    self._cooccurrence[item][other] = self._cooccurrence[item].get(other, 0) + 1
+                    self._cooccurrence[other][item] = self._cooccurrence[other].get(item, 0) + 1
+                    self._stale.add(other)
+                self._stale.add(item)
+                history[item] = None
+                for interest in interests:
+                    counts = self._interest_items.setdefault(interest.lower(), {})
+                    counts[item] = counts.get(item, 0) + 1
+    
+    def neighbors(self, item: int) -> List[Tuple[float, int]]:
+        """Top-k (cosine similarity, item) pairs for an item, refreshed if it changed since last read"""
+        with self._lock:
+            return self._fresh_neighbors(item)
+    
+    def _fresh_neighbors(self, item: int) -> List[Tuple[float, int]]:
+        if item in self._stale:
+            norm = self._item_users[item]
+            self._neighbors[item] = heapq.nlargest(
+                self.k, ((count / math.sqrt(norm * self._item_users[other]), other)
+                         for other, count in self._cooccurrence[item].items()))
+            self._stale.discard(item)
+        return self._neighbors[item]
+    
+    def refresh(self):
+        """Recompute every stale neighbour list now, for example after a bulk load"""
+        with self._lock:
+            for item in list(self._stale):
+                self._fresh_neighbors(item)
+    
+    def recommend(self, user: str, interests: List[str], limit: int) -> List[Tuple[float, Dict]]:
+        """
+        Up to limit (score, item) pairs for a user, scored by summed similarity to the user's items
+        A user with no history is seeded with the items most served to users sharing an interest
+        """
+        with self._lock:
+            history = self._user_items.get(user)
+            if history:
+                seeds = list(history)
+            else:
+                seeds = []
+                for interest in interests:
+                    counts = self._interest_items.get(interest.lower(), {})
+                    seeds.extend(heapq.nlargest(self.seeds_per_interest, counts, key=counts.get))
+            scores: Dict[int, float] = {}
+            for seed in seeds:
+                for similarity, other in self._fresh_neighbors(seed):
+                    if not history or other not in history:
+                        scores[other] = scores.get(other, 0.0) + similarity
+            best = heapq.nlargest(limit, scores.items(), key=lambda entry: entry[1])
+            return [(score, self.items[item]) for item, score in best]
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"users": len(self._user_items), "items": len(self.items),
+                    "pairs": sum(len(row) for row in self._cooccurrence) // 2, "stale": len(self._stale)}
 
 # CONTENT FETCHER AND RECOMMENDER
 
 class ContentRecommender:
     """Fetches and combines content from multiple sources based on inferred algorithms"""
     
-    def __init__(self, news_api_key: str):
-        self.news_client = NewsAPIClient(news_api_key)
-        self.reddit_client = RedditClient()
+    def __init__(self, news_api_key: str, max_workers: int = 8,
+                 transport: Optional[HTTPTransport] = None, cache: Optional[ResponseCache] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None,
+                 news_base_url: str = NEWS_API_BASE, reddit_base_url: str = REDDIT_API_BASE,
+                 rng: Optional[random.Random] = None, scorer: Optional[ContentScorer] = None,
+                 collaborative: Optional[ItemItemCF] = None, interest_graph: Optional[InterestGraph] = None):
+        self.transport = transport or get_default_transport()
+        self.interest_graph = interest_graph or get_default_interest_graph()
+        # Learns from every feed generated; the collaborative branch falls back to fetching while it is cold
+        self.collaborative = collaborative
+        # Relevance scoring; without NumPy the branches' random scores within each band are kept
+        self.scorer = scorer if scorer is not None else ContentScorer() if np is not None else None
+        # Default source of scores and shuffles; the global RNG unless a seeded one is given
+        self.rng = rng if rng is not None else random
+        self.cache = cache or get_default_cache()
+        self.single_flight = single_flight or DEFAULT_SINGLE_FLIGHT
+        self.breakers = breakers or DEFAULT_CIRCUIT_BREAKERS
+        # Branches and the per-interest requests they issue run on separate pools,
+        # so a branch waiting on its own requests can never starve the pool it runs on
+        self.branch_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="feed-branch")
+        self.fetch_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="feed-fetch")
+        self.news_client = NewsAPIClient(news_api_key, executor=self.fetch_executor,
+                                         transport=self.transport, cache=self.cache,
+                                         single_flight=self.single_flight, breakers=self.breakers,
+                                         base_url=news_base_url)
+        self.reddit_client = RedditClient(executor=self.fetch_executor, transport=self.transport,
+                                          cache=self.cache, single_flight=self.single_flight,
+                                          breakers=self.breakers, base_url=reddit_base_url)
+    
+    def close(self):
+        """Shut down the worker pools used for concurrent fetching"""
+        self.branch_executor.shutdown(wait=False)
+        self.fetch_executor.shutdown(wait=False)
+    
+    def frozen_corpus(self, commit: bool = True):
+        """Hold the scorer's corpus still for a scope (see ContentScorer.frozen)"""
+        return self.scorer.frozen(commit) if self.scorer is not None else contextlib.nullcontext()
     
     def generate_feed(self, character: Character, algorithm_weights: Dict[str, float], 
-                     total_items: int = 20) -> List[Recommendation]:
+                     total_items: int = 20, concurrent: bool = True, budget: Optional[float] = None,
+                     hedge_after: Optional[float] = None, rng: Optional[random.Random] = None,
+                     seen: Optional[Deduplicator] = None) -> List[Recommendation]:
         """
         Generate a recommendation feed based on algorithm weights
+        When concurrent is True every source of every algorithm is fetched at the same time;
+        budget and hedge_after bound the latency (see generate_feed_result). A seeded rng makes
+        scores and order reproducible, in both modes. Items returned by more than one source
+        appear once; with seen, items it already holds (from earlier feeds) are skipped too.
         """
-        recommendations = []
+        if budget is not None or hedge_after is not None:
+            return self.generate_feed_result(character, algorithm_weights, total_items, budget,
+                                             hedge_after, rng, seen).recommendations
+        
+        rng = rng if rng is not None else self.rng
+        items_per_algorithm = self._items_per_algorithm(algorithm_weights, total_items)
+        
+        tasks = self._feed_tasks(character, items_per_algorithm, rng)
+        with span("feed_seconds", mode="concurrent" if concurrent else "sequential"):
+            if concurrent:
+                futures = [self.branch_executor.submit(fetch, character, limit) for _, fetch, limit in tasks]
+                results = [future.result() for future in futures]
+            else:
+                results = [fetch(character, limit) for _, fetch, limit in tasks]
+        
+        # Merge in algorithm order so both modes see the same list before ranking
+        recommendations = self._dedupe(rec for branch_recs in results for rec in branch_recs)
+        self._score(character, recommendations)
+        self._rank(recommendations, rng, items_per_algorithm)
+        
+        feed = self._take(recommendations, total_items, seen)
+        self._learn(character, feed)
+        return feed
+    
+    def generate_feed_result(self, character: Character, algorithm_weights: Dict[str, float],
+                             total_items: int = 20, budget: Optional[float] = None,
+                             hedge_after: Optional[float] = None, rng: Optional[random.Random] = None,
+                             seen: Optional[Deduplicator] = None) -> FeedResult:
+        """
+        Generate a feed within a latency budget (seconds)
+        Sources still running at the deadline are filled from the cache or placeholders and
+        reported in cut_branches. With hedge_after, a source that has not answered by then gets
+        a duplicate request and whichever finishes first is used.
+        """
+        start = time.monotonic()
+        deadline = start + budget if budget is not None else None
+        rng = rng if rng is not None else self.rng
+        items_per_algorithm = self._items_per_algorithm(algorithm_weights, total_items)
+        tasks = self._feed_tasks(character, items_per_algorithm, rng)
+        
+        results: List[Optional[List[Recommendation]]] = [None] * len(tasks)
+        pending = {self.branch_executor.submit(fetch, character, limit): index
+                   for index, (_, fetch, limit) in enumerate(tasks)}
+        hedged = set()
+        
+        while pending:
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            wakeups = [] if deadline is None else [deadline]
+            # Wake for the hedge only until it fires; after that, only a result or the deadline matters
+            if hedge_after is not None and now < start + hedge_after:
+                wakeups.append(start + hedge_after)
+            timeout = max(0.0, min(wakeups) - now) if wakeups else None
+            
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                if results[index] is None:
+                    results[index] = future.result()
+            
+            # Hedge the stragglers once
+            if hedge_after is not None and time.monotonic() - start >= hedge_after:
+                for index in set(pending.values()) - hedged:
+                    if results[index] is None:
+                        _, fetch, limit = tasks[index]
+                        pending[self.branch_executor.submit(run_in_mode, "hedge", fetch, character,
+                                                            limit)] = index
+                        hedged.add(index)
+            
+            # Drop duplicates whose twin already answered
+            for future, index in list(pending.items()):
+                if results[index] is not None:
+                    del pending[future]
         
-        # Calculate how many items per algorithm based on weights
-        items_per_algorithm = {
+        # Fill whatever missed the deadline from the cache, or placeholders when nothing is cached
+        cut = []
+        for index, (algo, fetch, limit) in enumerate(tasks):
+            if results[index] is None:
+                results[index] = run_in_mode("cache_only", fetch, character, limit)
+                cut.append(algo)
+                count("feed_branches_cut_total", algorithm=algo)
+        for index in hedged:
+            count("feed_branches_hedged_total", algorithm=tasks[index][0])
+        
+        recommendations = self._dedupe(rec for branch_recs in results for rec in branch_recs)
+        self._score(character, recommendations)
+        self._rank(recommendations, rng, items_per_algorithm)
+        
+        elapsed = time.monotonic() - start
+        sink = get_metrics_sink()
+        if sink.enabled:
+            sink.observe("feed_seconds", elapsed, (("mode", "budget"), ("outcome", "ok")))
+        feed = self._take(recommendations, total_items, seen)
+        self._learn(character, feed)
+        return FeedResult(
+            recommendations=feed,
+            cut_branches=sorted(set(cut)),
+            hedged_branches=sorted({tasks[index][0] for index in hedged}),
+            elapsed=elapsed
+        )
+    
+    def iter_feed(self, character: Character, algorithm_weights: Dict[str, float],
+                  total_items: int = 20, rng: Optional[random.Random] = None,
+                  seen: Optional[Deduplicator] = None) -> Iterator[Recommendation]:
+        """
+        Streaming variant of generate_feed: yields recommendations as each source responds
+        Per-algorithm quotas and the total_items cap are enforced as items arrive; an item
+        already yielded by another source (or held by seen) is skipped without using the quota
+        """
+        rng = rng if rng is not None else self.rng
+        items_per_algorithm = self._items_per_algorithm(algorithm_weights, total_items)
+        remaining = dict(items_per_algorithm)
+        served = []
+        dedupe = Deduplicator()
+        
+        tasks = self._feed_tasks(character, items_per_algorithm, rng)
+        # Each branch ranks with its own stream, so arrival order does not change the result
+        shuffles = [random.Random(rng.getrandbits(64)) for _ in tasks]
+        futures = {self.branch_executor.submit(fetch, character, limit): (algo, shuffle)
+                   for (algo, fetch, limit), shuffle in zip(tasks, shuffles)}
+        try:
+            for future in as_completed(futures):
+                algo, shuffle = futures[future]
+                branch_recs = future.result()
+                # Rank within the source, since there is no global ranking; its best items fill the quota
+                self._score(character, branch_recs)
+                self._rank(branch_recs, shuffle)
+                for rec in branch_recs:
+                    if remaining[algo] <= 0:
+                        break
+                    if not dedupe.is_new(rec) or (seen is not None and not seen.is_new(rec)):
+                        continue
+                    remaining[algo] -= 1
+                    yield rec
+                    # The consumer came back for more, so it has taken rec
+                    served.append(rec)
+                    if len(served) >= total_items:
+                        return
+        finally:
+            # Consumer stopped early or the cap was reached: drop work that has not started,
+            # and learn only from what the consumer actually took
+            for future in futures:
+                future.cancel()
+            self._learn(character, served)
+    
+    def _learn(self, character: Character, feed: List[Recommendation]):
+        """Feed the served items back to the collaborative model as implicit interactions"""
+        if self.collaborative is not None:
+            self.collaborative.add_interactions(character.user_id, character.interests, feed)
+    
+    def _score(self, character: Character, recommendations: List[Recommendation]):
+        """Score every candidate of a feed (or of one streamed source) in one batch"""
+        if self.scorer is not None:
+            with span("scoring_seconds"):
+                self.scorer.score(character, recommendations)
+    
+    @staticmethod
+    def _rank(recommendations: List[Recommendation], rng: random.Random,
+              quotas: Optional[Dict[str, int]] = None):
+        """
+        Sort best score first, in place; the shuffle only orders ties, so equal scores still mix sources
+        Scores sit in per-algorithm bands, so with quotas (items per weight key) each algorithm's best
+        items up to its quota come first and the rest follow; truncating then keeps the weights' mix
+        """
+        rng.shuffle(recommendations)
+        recommendations.sort(key=lambda rec: rec.score, reverse=True)
+        if quotas is None:
+            return
+        remaining = {ALGORITHM_NAMES.get(algo, algo): quota for algo, quota in quotas.items()}
+        within, overflow = [], []
+        for rec in recommendations:
+            if remaining.get(rec.algorithm, 0) > 0:
+                remaining[rec.algorithm] -= 1
+                within.append(rec)
+            else:
+                overflow.append(rec)
+        recommendations[:] = within + overflow
+    
+    @staticmethod
+    def _dedupe(recommendations: Iterable[Recommendation]) -> List[Recommendation]:
+        """Keep the first copy of every item; earlier algorithms win, so the result is deterministic"""
+        dedupe = Deduplicator()
+        unique = dedupe.filter(recommendations)
+        count("feed_duplicates_total", dedupe.duplicates)
+        return unique
+    
+    @staticmethod
+    def _take(recommendations: List[Recommendation], total_items: int,
+              seen: Optional[Deduplicator]) -> List[Recommendation]:
+        """First total_items recommendations, skipping (and then recording) those seen already holds"""
+        if seen is None:
+            return recommendations[:total_items]
+        taken = []
+        for rec in recommendations:
+            if len(taken) >= total_items:
+                break
+            if seen.is_new(rec):
+                taken.append(rec)
+        return taken
+    
+    @staticmethod
+    def _items_per_algorithm(algorithm_weights: Dict[str, float], total_items: int) -> Dict[str, int]:
+        """Calculate how many items per algorithm based on weights"""
+        return {
             algo: max(1, int(weight * total_items))
             for algo, weight in algorithm_weights.items()
         }
+    
+    def _feed_tasks(self, character: Character, items_per_algorithm: Dict[str, int],
+                    rng: Optional[random.Random] = None) -> List[Tuple[str, Callable, int]]:
+        """
+        Split the feed into independent (algorithm, fetch function, limit) tasks, one per source
+        Each task gets its own stream seeded from rng in task order, so concurrent branches score
+        reproducibly no matter how their threads interleave
+        """
+        tasks = []
         
         # Content-Based Recommendations
         if items_per_algorithm["content_based"] > 0:
-            content_recs = self._get_content_based(character, items_per_algorithm["content_based"])
-            recommendations.extend(content_recs)
+            tasks.append(("content_based", self._content_based_news, items_per_algorithm["content_based"]))
+            tasks.append(("content_based", self._content_based_reddit, items_per_algorithm["content_based"]))
         
         # Collaborative Filtering Recommendations (simulated)
         if items_per_algorithm["collaborative"] > 0:
-            collab_recs = self._get_collaborative(character, items_per_algorithm["collaborative"])
-            recommendations.extend(collab_recs)
+            tasks.append(("collaborative", self._get_collaborative, items_per_algorithm["collaborative"]))
         
         # Popularity/Trending Recommendations
         if items_per_algorithm["popularity"] > 0:
-            popular_recs = self._get_popularity(character, items_per_algorithm["popularity"])
-            recommendations.extend(popular_recs)
+            tasks.append(("popularity", self._popularity_news, items_per_algorithm["popularity"]))
+            tasks.append(("popularity", self._popularity_reddit, items_per_algorithm["popularity"]))
         
         # Demographic Filtering Recommendations
         if items_per_algorithm["demographic"] > 0:
-            demo_recs = self._get_demographic(character, items_per_algorithm["demographic"])
-            recommendations.extend(demo_recs)
+            tasks.append(("demographic", self._get_demographic, items_per_algorithm["demographic"]))
         
-        # Shuffle to mix different algorithm results
-        random.shuffle(recommendations)
+        rng = rng if rng is not None else self.rng
+        tasks = [(algo, functools.partial(fetch, rng=random.Random(rng.getrandbits(64))), limit)
+                 for algo, fetch, limit in tasks]
+        if get_metrics_sink().enabled:
+            tasks = [(algo, self._timed_branch(algo, fetch), limit) for algo, fetch, limit in tasks]
+        return tasks
+    
+    @staticmethod
+    def _timed_branch(algo: str, fetch: Callable) -> Callable:
+        """Wrap a branch so its run time lands in feed_branch_seconds"""
+        labels = {"algorithm": algo, "branch": getattr(fetch, "func", fetch).__name__.lstrip("_")}
         
-        return recommendations[:total_items]
+        def timed_fetch(character: Character, limit: int) -> List[Recommendation]:
+            with span("feed_branch_seconds", **labels):
+                return fetch(character, limit)
+        return timed_fetch
     
-    def _get_content_based(self, character: Character, limit: int) -> List[Recommendation]:
+    def _get_content_based(self, character: Character, limit: int,
+                           rng: Optional[random.Random] = None) -> List[Recommendation]:
         """Fetch content based on user interests"""
+        return self._content_based_news(character, limit, rng) + self._content_based_reddit(character, limit, rng)
+    
+    def _content_based_news(self, character: Character, limit: int,
+                            rng: Optional[random.Random] = None) -> List[Recommendation]:
+        """Fetch interest-based news articles"""
+        rng = rng if rng is not None else self.rng
         recommendations = []
         
         # Fetch from NewsAPI
@@ -432,11 +2874,19 @@ class ContentRecommender:
                 source=f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
                 url=article.get("url", "#"),
                 algorithm="Content-Based",
-                score=random.uniform(0.7, 0.95),
+                score=rng.uniform(*SCORE_RANGES["Content-Based"]),
                 description=article.get("description", "")[:200] if article.get("description") else "",
                 published_at=article.get("publishedAt", "")
             ))
         
+        return recommendations
+    
+    def _content_based_reddit(self, character: Character, limit: int,
+                              rng: Optional[random.Random] = None) -> List[Recommendation]:
+        """Fetch interest-based Reddit posts"""
+        rng = rng if rng is not None else self.rng
+        recommendations = []
+        
         # Fetch from Reddit
         reddit_posts = self.reddit_client.fetch_by_interests(character.interests, limit//2 + 1)
         for post in reddit_posts[:limit//2]:
@@ -445,16 +2895,32 @@ class ContentRecommender:
                 source=f"Reddit - r/{post.get('subreddit', 'unknown')}",
                 url=post.get("url", "#"),
                 algorithm="Content-Based",
-                score=random.uniform(0.7, 0.95),
+                score=rng.uniform(*SCORE_RANGES["Content-Based"]),
                 description=f"Score: {post.get('score', 0)}"
             ))
         
         return recommendations
     
-    def _get_collaborative(self, character: Character, limit: int) -> List[Recommendation]:
-        """Simulate collaborative filtering recommendations"""
+    def _get_collaborative(self, character: Character, limit: int,
+                           rng: Optional[random.Random] = None) -> List[Recommendation]:
+        """Collaborative filtering recommendations: item neighbours from the model, or a simulation while it is cold"""
+        rng = rng if rng is not None else self.rng
         recommendations = []
         
+        if self.collaborative is not None:
+            for _, item in self.collaborative.recommend(character.user_id, character.interests, limit):
+                recommendations.append(Recommendation(
+                    title=item["title"],
+                    source=item["source"],
+                    url=item["url"],
+                    algorithm="Collaborative",
+                    score=rng.uniform(*SCORE_RANGES["Collaborative"]),
+                    description="Popular with users who liked the same content",
+                    published_at=item["published_at"]
+                ))
+            if recommendations:
+                return recommendations
+        
         # Simulate by fetching related interests
         related_interests = self._get_related_interests(character.interests)
         
@@ -466,14 +2932,21 @@ class ContentRecommender:
                 source=f"Reddit - r/{post.get('subreddit', 'unknown')}",
                 url=post.get("url", "#"),
                 algorithm="Collaborative",
-                score=random.uniform(0.6, 0.85),
+                score=rng.uniform(*SCORE_RANGES["Collaborative"]),
                 description=f"Based on similar users' preferences"
             ))
         
         return recommendations
     
-    def _get_popularity(self, character: Character, limit: int) -> List[Recommendation]:
+    def _get_popularity(self, character: Character, limit: int,
+                        rng: Optional[random.Random] = None) -> List[Recommendation]:
         """Fetch trending/popular content"""
+        return self._popularity_news(character, limit, rng) + self._popularity_reddit(character, limit, rng)
+    
+    def _popularity_news(self, character: Character, limit: int,
+                         rng: Optional[random.Random] = None) -> List[Recommendation]:
+        """Fetch trending news articles"""
+        rng = rng if rng is not None else self.rng
         recommendations = []
         
         # Fetch trending news
@@ -484,11 +2957,19 @@ class ContentRecommender:
                 source=f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
                 url=article.get("url", "#"),
                 algorithm="Popularity/Trending",
-                score=random.uniform(0.8, 1.0),
+                score=rng.uniform(*SCORE_RANGES["Popularity/Trending"]),
                 description="Trending now",
                 published_at=article.get("publishedAt", "")
             ))
         
+        return recommendations
+    
+    def _popularity_reddit(self, character: Character, limit: int,
+                           rng: Optional[random.Random] = None) -> List[Recommendation]:
+        """Fetch trending Reddit posts"""
+        rng = rng if rng is not None else self.rng
+        recommendations = []
+        
         # Fetch trending Reddit posts
         reddit_trending = self.reddit_client.fetch_trending(limit//2 + 1)
         for post in reddit_trending[:limit//2]:
@@ -497,14 +2978,16 @@ class ContentRecommender:
                 source=f"Reddit - r/{post.get('subreddit', 'unknown')}",
                 url=post.get("url", "#"),
                 algorithm="Popularity/Trending",
-                score=random.uniform(0.8, 1.0),
+                score=rng.uniform(*SCORE_RANGES["Popularity/Trending"]),
                 description=f"Popular with {post.get('score', 0)} upvotes"
             ))
         
         return recommendations
     
-    def _get_demographic(self, character: Character, limit: int) -> List[Recommendation]:
+    def _get_demographic(self, character: Character, limit: int,
+                         rng: Optional[random.Random] = None) -> List[Recommendation]:
         """Fetch content based on demographic attributes"""
+        rng = rng if rng is not None else self.rng
         recommendations = []
         
         # Fetch location-based news
@@ -515,33 +2998,119 @@ class ContentRecommender:
                 source=f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
                 url=article.get("url", "#"),
                 algorithm="Demographic",
-                score=random.uniform(0.65, 0.9),
+                score=rng.uniform(*SCORE_RANGES["Demographic"]),
                 description=f"Relevant to {character.location}",
                 published_at=article.get("publishedAt", "")
             ))
         
         return recommendations
     
-    def _get_related_interests(self, interests: List[str]) -> List[str]:
+    def _get_related_interests(self, interests: List[str], limit: int = 3) -> List[str]:
         """Get interests related to the user's interests"""
-        interest_relations = {
-            "technology": ["programming", "gadgets", "AI"],
-            "gaming": ["esports", "gamedev", "pcgaming"],
-            "sports": ["fitness", "olympics", "soccer"],
-            "music": ["concerts", "instruments", "audio"],
-            "art": ["design", "photography", "crafts"],
-            "science": ["space", "biology", "physics"],
-            "food": ["cooking", "recipes", "restaurants"],
-            "travel": ["backpacking", "digitalnomad", "solotravel"],
-            "business": ["entrepreneur", "startups", "investing"],
-            "health": ["nutrition", "meditation", "wellness"]
-        }
+        return self.interest_graph.expand(interests, limit)
+
+# BATCH FEED PLANNING
+
+class BatchFeedPlanner:
+    """
+    Generates feeds for many characters while fetching each distinct upstream query once
+    Every query the population needs is collected up front, fetched concurrently into the
+    recommender's response cache, and the per-character feeds are then assembled from memory
+    """
+    
+    def __init__(self, recommender: ContentRecommender):
+        self.recommender = recommender
+    
+    def plan(self, characters: List[Character], weights: List[Dict[str, float]],
+             total_items: int = 20) -> Dict[str, Dict[str, int]]:
+        """Collect the distinct queries, each with the largest limit any character asks for"""
+        news = self.recommender.news_client
+        reddit = self.recommender.reddit_client
+        queries = {"news_topics": {}, "subreddits": {}, "countries": {}}
         
-        related = []
-        for interest in interests:
-            related.extend(interest_relations.get(interest.lower(), [interest]))
+        def need(kind: str, query: str, limit: int):
+            queries[kind][query] = max(limit, queries[kind].get(query, 0))
+        
+        for character, algorithm_weights in zip(characters, weights):
+            items = ContentRecommender._items_per_algorithm(algorithm_weights, total_items)
+            
+            # Mirrors the requests issued by ContentRecommender's branches
+            content_limit = items["content_based"]//2 + 1
+            for interest in character.interests[:2]:
+                need("news_topics", interest, content_limit)
+                need("subreddits", reddit.subreddit_for(interest), content_limit)
+            for interest in self.recommender._get_related_interests(character.interests)[:2]:
+                need("subreddits", reddit.subreddit_for(interest), items["collaborative"])
+            need("countries", "us", items["popularity"]//2 + 1)  # Trending news
+            need("subreddits", "popular", items["popularity"]//2 + 1)  # Trending posts
+            need("countries", news.country_for_location(character.location), items["demographic"])
+        
+        if not news._has_api_key():
+            # The news client answers with placeholders without touching the network
+            queries["news_topics"].clear()
+            queries["countries"].clear()
+        return queries
+    
+    @staticmethod
+    @contextlib.contextmanager
+    def scope(queries: Dict[str, Dict[str, int]]) -> Iterator[BatchScope]:
+        """
+        Run the enclosed requests in a batch scope for the planned queries
+        A common page size maps every character's request onto the prefetched response, and the
+        scope holds those responses, so they do not depend on surviving the response cache's LRU
+        """
+        page_size = max((limit for kind in queries.values() for limit in kind.values()), default=0)
+        token = BATCH_SCOPE.set(BatchScope(page_size or None))
+        try:
+            yield BATCH_SCOPE.get()
+        finally:
+            BATCH_SCOPE.reset(token)
+    
+    def prefetch(self, queries: Dict[str, Dict[str, int]]) -> int:
+        """Fetch every planned query once, concurrently, into the current scope; returns how many were issued"""
+        news = self.recommender.news_client
+        reddit = self.recommender.reddit_client
         
-        return related[:3]  # Limit to 3 related interests
+        executor = self.recommender.branch_executor
+        # Each request runs in a copy of the caller's context, so it sees (and fills) the batch scope
+        submit = lambda fn, *args: executor.submit(contextvars.copy_context().run, fn, *args)
+        futures = [submit(news._fetch_interest, topic, limit) for topic, limit in queries["news_topics"].items()]
+        futures += [submit(reddit._fetch_subreddit, subreddit, limit)
+                    for subreddit, limit in queries["subreddits"].items()]
+        futures += [submit(news._fetch_headlines, country, limit, f"country '{country}'")
+                    for country, limit in queries["countries"].items()]
+        for future in futures:
+            future.result()
+        return len(futures)
+    
+    def generate_feeds(self, characters: List[Character], weights: List[Dict[str, float]],
+                       total_items: int = 20,
+                       streams: Optional[RandomStreams] = None) -> List[List[Recommendation]]:
+        """
+        Generate one feed per character; upstream requests scale with distinct queries, not users
+        With streams, character i's feed draws from streams.child(i)
+        """
+        queries = self.plan(characters, weights, total_items)
+        with self.scope(queries):
+            self.prefetch(queries)
+            return [self.recommender.generate_feed(character, algorithm_weights, total_items, concurrent=False,
+                                                   rng=streams.child(i).python() if streams is not None else None)
+                    for i, (character, algorithm_weights) in enumerate(zip(characters, weights))]
+    
+    def warm_collaborative(self, characters: List[Character], total_items: int = 20,
+                           streams: Optional[RandomStreams] = None) -> ItemItemCF:
+        """
+        Build (or extend) the recommender's collaborative model from a simulated population
+        Every generated feed is recorded as that character's interactions. streams should be a
+        stream reserved for the warm-up (see main), so it never overlaps a batch's per-line streams
+        """
+        if self.recommender.collaborative is None:
+            self.recommender.collaborative = ItemItemCF()
+        engine = RecommendationInferenceEngine(streams.child(0).python() if streams is not None else None)
+        weights = [dict(engine.infer_algorithms(character)) for character in characters]
+        self.generate_feeds(characters, weights, total_items, streams.child(1) if streams is not None else None)
+        self.recommender.collaborative.refresh()
+        return self.recommender.collaborative
 
 # USER INTERFACE FUNCTIONS
 
@@ -669,6 +3238,199 @@ class InteractiveCharacterBuilder:
         
         return character
 
+# SUMMARY STATISTICS
+
+# Source labels look like "NewsAPI - BBC News" or "Reddit - r/technology"
+SOURCE_TYPES = ("NewsAPI", "Reddit")
+
+def source_type(source: str) -> str:
+    """Collapse a recommendation's source label into NewsAPI, Reddit or Other"""
+    prefix = source.partition(" - ")[0]
+    return prefix if prefix in SOURCE_TYPES else "Other"
+
+class RunningStats:
+    """Count, mean, variance (Welford), min and max in constant memory; merges exactly (Chan et al.)"""
+    
+    __slots__ = ("count", "mean", "m2", "min", "max")
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        if other.count:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total
+            self.m2 += other.m2 + delta * delta * self.count * other.count / total
+            self.count = total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        return self
+    
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 for fewer than two values)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+    
+    def to_dict(self) -> Dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2,
+                "min": self.min if self.count else None, "max": self.max if self.count else None}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RunningStats":
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = data["count"], data["mean"], data["m2"]
+        if stats.count:
+            stats.min, stats.max = data["min"], data["max"]
+        return stats
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative error bounded by `accuracy` (DDSketch-style log buckets)
+    Memory grows with the log of the value range, not with the number of values
+    """
+    
+    def __init__(self, accuracy: float = 0.01):
+        self.accuracy = accuracy
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zeros = 0  # Values <= 0 (scores are non-negative)
+        self.count = 0
+    
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+    
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.accuracy != self.accuracy:
+            raise ValueError("cannot merge sketches with different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0 <= q <= 1), or None if the sketch is empty"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i], in relative terms
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.buckets) / (self._gamma + 1)
+    
+    def to_dict(self) -> Dict:
+        return {"accuracy": self.accuracy, "zeros": self.zeros, "count": self.count,
+                "buckets": {str(index): count for index, count in self.buckets.items()}}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuantileSketch":
+        sketch = cls(data["accuracy"])
+        sketch.zeros, sketch.count = data["zeros"], data["count"]
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        return sketch
+
+class FeedSummary:
+    """
+    Single-pass aggregate over any number of feeds: per-algorithm counts and score statistics,
+    overall score quantiles and the source mix, in constant memory. Summaries of separate
+    batches, threads or processes merge into the summary of their union
+    """
+    
+    def __init__(self, accuracy: float = 0.01):
+        self.characters = 0
+        self.scores = RunningStats()
+        self.quantiles = QuantileSketch(accuracy)
+        self.algorithms: Dict[str, RunningStats] = {}
+        self.source_counts: Dict[str, int] = {}
+    
+    @property
+    def recommendations(self) -> int:
+        return self.scores.count
+    
+    @property
+    def algorithm_counts(self) -> Dict[str, int]:
+        return {algo: stats.count for algo, stats in self.algorithms.items()}
+    
+    def average_scores(self) -> Dict[str, float]:
+        return {algo: stats.mean for algo, stats in self.algorithms.items()}
+    
+    def add(self, rec: Recommendation):
+        """Fold one recommendation into every statistic"""
+        self.scores.add(rec.score)
+        self.quantiles.add(rec.score)
+        stats = self.algorithms.get(rec.algorithm)
+        if stats is None:
+            stats = self.algorithms[rec.algorithm] = RunningStats()
+        stats.add(rec.score)
+        source = source_type(rec.source)
+        self.source_counts[source] = self.source_counts.get(source, 0) + 1
+    
+    def add_feed(self, recommendations: Iterable[Recommendation]):
+        """Fold one character's feed into the totals"""
+        self.characters += 1
+        for rec in recommendations:
+            self.add(rec)
+    
+    def merge(self, other: "FeedSummary") -> "FeedSummary":
+        """Add another summary (for example another shard's) into this one"""
+        self.characters += other.characters
+        self.scores.merge(other.scores)
+        self.quantiles.merge(other.quantiles)
+        for algo, stats in other.algorithms.items():
+            self.algorithms.setdefault(algo, RunningStats()).merge(stats)
+        for source, count in other.source_counts.items():
+            self.source_counts[source] = self.source_counts.get(source, 0) + count
+        return self
+    
+    def to_dict(self) -> Dict:
+        return {
+            "characters": self.characters,
+            "scores": self.scores.to_dict(),
+            "quantiles": self.quantiles.to_dict(),
+            "algorithms": {algo: stats.to_dict() for algo, stats in self.algorithms.items()},
+            "source_counts": dict(self.source_counts)
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FeedSummary":
+        summary = cls()
+        summary.characters = data["characters"]
+        summary.scores = RunningStats.from_dict(data["scores"])
+        summary.quantiles = QuantileSketch.from_dict(data["quantiles"])
+        summary.algorithms = {algo: RunningStats.from_dict(stats) for algo, stats in data["algorithms"].items()}
+        summary.source_counts = dict(data["source_counts"])
+        return summary
+
 # DISPLAY FUNCTIONS
 
 def display_character_profile(character: Character):
@@ -720,79 +3482,92 @@ def display_algorithm_inference(weights: Dict[str, float]):
     
     print("\nSecondary algorithms would supplement the primary approach.")
 
-def display_recommendations(recommendations: List[Recommendation]):
-    """Display the generated recommendations"""
+def display_recommendations(recommendations: Iterable[Recommendation],
+                            shown: Optional[List[Recommendation]] = None) -> List[Recommendation]:
+    """
+    Display the generated recommendations, grouped by algorithm, as they arrive
+    Accepts a list or a stream such as iter_feed; every item received is appended to shown
+    (and returned), so a caller keeps what was displayed even if the stream fails midway
+    """
     print("\n" + "-"*80)
     print("YOUR PERSONALIZED RECOMMENDATION FEED")
     print("-"*80)
     
-    if not recommendations:
-        print("No recommendations generated.")
-        return
-    
-    # Group by algorithm for better display
-    algo_groups = {}
+    shown = [] if shown is None else shown
+    # A stream can interleave algorithms, so a group's header is repeated when it resumes
+    algo_counts: Dict[str, int] = {}
+    current = None
     for rec in recommendations:
-        if rec.algorithm not in algo_groups:
-            algo_groups[rec.algorithm] = []
-        algo_groups[rec.algorithm].append(rec)
-    
-    for algo, recs in algo_groups.items():
-        print(f"\n📊 {algo.upper()} RECOMMENDATIONS ({len(recs)} items)")
-        print("-" * 60)
-        
-        for i, rec in enumerate(recs[:5], 1):  # Show max 5 per algorithm
-            print(f"{i}. {rec.title[:70]}{'...' if len(rec.title) > 70 else ''}")
-            print(f"   Source: {rec.source}")
-            print(f"   Score: {rec.score:.2f}")
-            if rec.description:
-                desc = rec.description[:100] + "..." if len(rec.description) > 100 else rec.description
-                print(f"   {desc}")
-            if rec.url != "#":
-                print(f"   URL: {rec.url}")
-            print()
+        shown.append(rec)
+        algo_counts[rec.algorithm] = algo_counts.get(rec.algorithm, 0) + 1
+        i = algo_counts[rec.algorithm]
+        if i > 5:  # Show max 5 per algorithm
+            continue
+        if rec.algorithm != current:
+            current = rec.algorithm
+            print(f"\n📊 {current.upper()} RECOMMENDATIONS")
+            print("-" * 60)
+        
+        print(f"{i}. {rec.title[:70]}{'...' if len(rec.title) > 70 else ''}")
+        print(f"   Source: {rec.source}")
+        print(f"   Score: {rec.score:.2f}")
+        if rec.description:
+            desc = rec.description[:100] + "..." if len(rec.description) > 100 else rec.description
+            print(f"   {desc}")
+        if rec.url != "#":
+            print(f"   URL: {rec.url}")
+        print()
+    
+    if not shown:
+        print("No recommendations generated.")
+    else:
+        print(", ".join(f"{algo}: {total} items" for algo, total in algo_counts.items()))
+    return shown
 
 def display_summary_stats(character: Character, weights: Dict[str, float], 
-                         recommendations: List[Recommendation]):
+                         recommendations: Iterable[Recommendation]):
     """Display summary statistics about the recommendation session"""
+    # One pass over the feed; works the same on a list or a stream of any length
+    summary = FeedSummary()
+    summary.add_feed(recommendations)
+    
     print("\n" + "="*80)
     print("SESSION SUMMARY")
     print("="*80)
     
     print(f"Character: {character.name}")
-    print(f"Total Recommendations Generated: {len(recommendations)}")
+    print(f"Total Recommendations Generated: {summary.recommendations}")
+    _print_summary_sections(summary)
+
+def display_population_summary(summary: FeedSummary):
+    """Display the merged statistics of a population run"""
+    print("\n" + "="*80)
+    print("POPULATION SUMMARY")
+    print("="*80)
     
-    # Algorithm distribution
-    algo_counts = {}
-    for rec in recommendations:
-        algo_counts[rec.algorithm] = algo_counts.get(rec.algorithm, 0) + 1
+    print(f"Characters: {summary.characters}")
+    print(f"Total Recommendations Generated: {summary.recommendations}")
+    _print_summary_sections(summary)
+
+def _print_summary_sections(summary: FeedSummary):
+    """Algorithm mix, score statistics and source mix shared by the session and population summaries"""
+    total = summary.recommendations
     
     print("\nRecommendations by Algorithm:")
-    for algo, count in sorted(algo_counts.items()):
-        percentage = (count / len(recommendations)) * 100 if recommendations else 0
+    for algo, count in sorted(summary.algorithm_counts.items()):
+        percentage = (count / total) * 100 if total else 0
         print(f"  {algo}: {count} ({percentage:.1f}%)")
     
-    # Average scores by algorithm
     print("\nAverage Recommendation Scores:")
-    algo_scores = {}
-    for rec in recommendations:
-        if rec.algorithm not in algo_scores:
-            algo_scores[rec.algorithm] = []
-        algo_scores[rec.algorithm].append(rec.score)
-    
-    for algo, scores in algo_scores.items():
-        avg_score = sum(scores) / len(scores) if scores else 0
-        print(f"  {algo}: {avg_score:.3f}")
-    
-    # Source distribution
-    source_counts = {}
-    for rec in recommendations:
-        source_type = "NewsAPI" if "NewsAPI" in rec.source else "Reddit" if "Reddit" in rec.source else "Other"
-        source_counts[source_type] = source_counts.get(source_type, 0) + 1
+    for algo, stats in summary.algorithms.items():
+        print(f"  {algo}: {stats.mean:.3f} (std {stats.std:.3f})")
+    if total:
+        p10, p50, p90 = (summary.quantiles.quantile(q) for q in (0.1, 0.5, 0.9))
+        print(f"  Overall: {summary.scores.mean:.3f}, p10 {p10:.3f}, median {p50:.3f}, p90 {p90:.3f}")
     
     print("\nContent Sources:")
-    for source, count in sorted(source_counts.items()):
-        percentage = (count / len(recommendations)) * 100 if recommendations else 0
+    for source, count in sorted(summary.source_counts.items()):
+        percentage = (count / total) * 100 if total else 0
         print(f"  {source}: {count} ({percentage:.1f}%)")
 
 def create_sample_character() -> Character:
@@ -811,6 +3586,38 @@ def create_sample_character() -> Character:
         education_level="college"
     )
 
+def generate_population(size: int, seed: Optional[int] = None) -> List[Character]:
+    """Create a reproducible population of random characters for simulations and benchmarks"""
+    return list(iter_population(size, seed))
+
+def iter_population(size: int, seed: Optional[int] = None) -> Iterator[Character]:
+    """Lazily yield the characters of generate_population, for populations too large to hold at once"""
+    rng = random.Random(seed)
+    interests = list(RedditClient.SUBREDDIT_MAP)
+    traits = ["creative", "analytical", "social", "introverted", "adventurous", "curious", "calm",
+              "ambitious", "practical", "empathetic"]
+    locations = ["New York, USA", "London, UK", "Toronto, Canada", "Sydney, Australia", "Berlin, Germany",
+                 "Paris, France", "Tokyo, Japan", "Mumbai, India", "Madrid, Spain", "Not specified"]
+    occupations = ["Software Engineer", "Teacher", "Student", "Artist", "Nurse", "Designer", "Retired", ""]
+    genders = ["Male", "Female", "Non-binary", "Not specified"]
+    
+    # Seeded populations get stable ids, so the same simulated user is recognized across runs
+    for i in range(size):
+        yield Character(
+            user_id=f"sim-{seed}-{i}" if seed is not None else uuid.uuid4().hex,
+            name=f"Sim User {i}",
+            age=rng.randint(13, 80),
+            gender=rng.choice(genders),
+            location=rng.choice(locations),
+            occupation=rng.choice(occupations),
+            interests=rng.sample(interests, rng.randint(1, 5)),
+            personality_traits=rng.sample(traits, rng.randint(1, 5)),
+            activity_level=rng.choice(ACTIVITY_LEVELS),
+            tech_savviness=rng.choice(TECH_SAVVINESS_LEVELS),
+            social_connectivity=rng.choice([25, 50, 60, 75, 90]),
+            education_level=rng.choice(EDUCATION_LEVELS)
+        )
+
 def main_menu():
     """Display main menu and handle user choices"""
     while True:
@@ -853,15 +3660,18 @@ def run_recommendation_analysis(character: Character, api_key: str):
     print("\n🔄 Fetching personalized content recommendations...")
     print("   (This may take a few moments while we query APIs...)")
     
-    # Generate recommendations
+    # Generate recommendations, showing each one as soon as its source responds
+    recommendations = []
     try:
-        recommendations = content_recommender.generate_feed(character, algorithm_weights, 15)
+        display_recommendations(content_recommender.iter_feed(character, algorithm_weights, 15),
+                                recommendations)
     except Exception as e:
+        # Keep what was already shown, so the summary and export match the screen
         print(f"\n❌ Error generating recommendations: {e}")
-        recommendations = []
+    finally:
+        content_recommender.close()
     
     # Display results
-    display_recommendations(recommendations)
     display_summary_stats(character, algorithm_weights, recommendations)
     
     # Interactive options
@@ -878,7 +3688,8 @@ def run_recommendation_analysis(character: Character, api_key: str):
         if option == "1":
             display_detailed_recommendations(recommendations)
         elif option == "2":
-            export_results(character, algorithm_weights, recommendations)
+            export_format = input("Format (txt, jsonl, jsonl.gz, parquet, arrow) [txt]: ").strip().lower()
+            export_results(character, algorithm_weights, recommendations, export_format or "txt")
         elif option == "3":
             return "restart"
         elif option == "4":
@@ -911,10 +3722,22 @@ def display_detailed_recommendations(recommendations: List[Recommendation]):
         print("-" * 40)
 
 def export_results(character: Character, weights: Dict[str, float], 
-                  recommendations: List[Recommendation]):
-    """Export results to a text file"""
+                  recommendations: Iterable[Recommendation], fmt: str = "txt"):
+    """
+    Export results to a file, writing recommendations as they are consumed
+    fmt is "txt" for the readable report, or any extension open_sink understands
+    """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"recommendation_analysis_{character.name.replace(' ', '_')}_{timestamp}.txt"
+    filename = f"recommendation_analysis_{character.name.replace(' ', '_')}_{timestamp}.{fmt}"
+    
+    if fmt != "txt":
+        try:
+            with open_sink(filename) as sink:
+                sink.write(export_record(1, character, weights, recommendations))
+            print(f"\n Results exported to: {filename}")
+        except Exception as e:
+            print(f"\n Error exporting results: {e}")
+        return
     
     try:
         with open(filename, 'w', encoding='utf-8') as f:
@@ -963,8 +3786,760 @@ def export_results(character: Character, weights: Dict[str, float],
     except Exception as e:
         print(f"\n Error exporting results: {e}")
 
-def main():
+# EXPORT SINKS
+
+def export_record(line_number: int, character: Character, weights: Dict[str, float],
+                  recommendations: Iterable[Recommendation]) -> Dict:
+    """The exported form of one character's session: full profile, weights and recommendations"""
+    return {
+        "line": line_number,
+        "character": asdict(character),
+        "weights": dict(weights),
+        "recommendations": [asdict(rec) for rec in recommendations]
+    }
+
+class ExportSink:
+    """
+    Buffered writer of export records; subclasses define how a batch reaches the file
+    At most batch_size records are held in memory. With append, records are added after
+    whatever an earlier run wrote instead of replacing it
+    """
+    
+    def __init__(self, path: str, append: bool = False, batch_size: int = 1000):
+        self.path = path
+        self.append = append
+        self.batch_size = batch_size
+        self.records_written = 0
+        self.records_failed = 0  # Records in batches the file rejected; they are dropped, not retried
+        self._buffer: List[Dict] = []
+    
+    def write(self, record: Dict):
+        """Queue one record (see export_record), flushing when the buffer is full"""
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            try:
+                self._write_batch(batch)
+            except Exception:
+                self.records_failed += len(batch)
+                raise
+            self.records_written += len(batch)
+    
+    def _write_batch(self, records: List[Dict]):
+        raise NotImplementedError
+    
+    def close(self):
+        self.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+class JSONLSink(ExportSink):
+    """One JSON object per line; each batch is a single write call"""
+    
+    def __init__(self, path: str, append: bool = False, batch_size: int = 1000):
+        super().__init__(path, append, batch_size)
+        self._file = self._open("a" if append else "w")
+    
+    def _open(self, mode: str):
+        return open(self.path, mode, encoding="utf-8")
+    
+    def _write_batch(self, records: List[Dict]):
+        self._file.write("".join(json.dumps(record) + "\n" for record in records))
+    
+    def close(self):
+        # The file is closed even when the final flush fails
+        try:
+            super().close()
+        finally:
+            self._file.close()
+
+class GzipJSONLSink(JSONLSink):
+    """Gzip-compressed JSONL; appending adds a gzip member, which readers see as one stream"""
+    
+    def _open(self, mode: str):
+        return gzip.open(self.path, mode + "t", encoding="utf-8", compresslevel=6)
+
+class ArrowSink(ExportSink):
+    """
+    Columnar export with a fixed schema, one row per character: profile columns, one weight
+    column per algorithm and a list<struct> column of recommendations. Each batch becomes a
+    Parquet row group or an Arrow IPC record batch; Arrow IPC files can be memory-mapped and
+    read without copying (pyarrow.ipc.open_file(pyarrow.memory_map(path)))
+    Neither format can be extended in place, so append writes the next numbered part next
+    to path (name.1.parquet, name.2.parquet, ...), which pyarrow.dataset reads as one table
+    """
+    
+    FORMATS = ("parquet", "arrow")
+    
+    def __init__(self, path: str, fmt: str = "parquet", append: bool = False, batch_size: int = 1000):
+        _require_pyarrow("columnar export")
+        if fmt not in self.FORMATS:
+            raise ValueError(f"fmt must be one of {self.FORMATS}, not {fmt!r}")
+        if append:
+            path = self._next_part(path)
+        super().__init__(path, append, batch_size)
+        self.fmt = fmt
+        self.schema = self.export_schema()
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(path, self.schema)
+    
+    @staticmethod
+    def _next_part(path: str) -> str:
+        if not os.path.exists(path):
+            return path
+        stem, extension = os.path.splitext(path)
+        part = 1
+        while os.path.exists(f"{stem}.{part}{extension}"):
+            part += 1
+        return f"{stem}.{part}{extension}"
+    
+    @staticmethod
+    def export_schema() -> "pa.Schema":
+        """The fixed export schema; field order matches Character, Recommendation and ALGORITHMS"""
+        _require_pyarrow("columnar export")
+        recommendation = pa.struct([
+            ("title", pa.string()), ("source", pa.string()), ("url", pa.string()),
+            ("algorithm", pa.string()), ("score", pa.float64()), ("description", pa.string()),
+            ("published_at", pa.string())
+        ])
+        return pa.schema([
+            ("line", pa.int64()), ("name", pa.string()), ("age", pa.int32()), ("gender", pa.string()),
+            ("location", pa.string()), ("occupation", pa.string()),
+            ("interests", pa.list_(pa.string())), ("personality_traits", pa.list_(pa.string())),
+            ("activity_level", pa.string()), ("tech_savviness", pa.string()),
+            ("social_connectivity", pa.int32()), ("education_level", pa.string()), ("user_id", pa.string()),
+            *[(f"weight_{algo}", pa.float64()) for algo in RecommendationInferenceEngine.ALGORITHMS],
+            ("recommendations", pa.list_(recommendation))
+        ])
+    
+    def _write_batch(self, records: List[Dict]):
+        columns: Dict[str, list] = {name: [] for name in self.schema.names}
+        for record in records:
+            columns["line"].append(record["line"])
+            for key, value in record["character"].items():
+                columns[key].append(value)
+            for algo in RecommendationInferenceEngine.ALGORITHMS:
+                columns[f"weight_{algo}"].append(record["weights"].get(algo))
+            columns["recommendations"].append(record["recommendations"])
+        self._writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=self.schema))
+    
+    def close(self):
+        # The writer is closed (and the footer written) even when the final flush fails
+        try:
+            super().close()
+        finally:
+            self._writer.close()
+
+def open_sink(path: str, append: bool = False, batch_size: int = 1000) -> ExportSink:
+    """Pick a sink from the file extension: .jsonl, .jsonl.gz, .parquet or .arrow (.feather)"""
+    lowered = path.lower()
+    if lowered.endswith(".jsonl.gz") or lowered.endswith(".ndjson.gz"):
+        return GzipJSONLSink(path, append, batch_size)
+    if lowered.endswith(".jsonl") or lowered.endswith(".ndjson"):
+        return JSONLSink(path, append, batch_size)
+    if lowered.endswith(".parquet"):
+        return ArrowSink(path, "parquet", append, batch_size)
+    if lowered.endswith(".arrow") or lowered.endswith(".feather"):
+        return ArrowSink(path, "arrow", append, batch_size)
+    raise ValueError(f"cannot tell the export format of {path!r}; use .jsonl, .jsonl.gz, .parquet or .arrow")
+
+# LOCAL STUB SERVER
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """Request handler bound to a StubAPIServer through the stub class attribute"""
+    
+    stub: "StubAPIServer" = None
+    
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        time.sleep(self.stub.sample_latency())
+        status, body = self.stub.respond(parts.path, dict(parse_qsl(parts.query)))
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+class StubAPIServer:
+    """
+    Local HTTP server imitating NewsAPI /v2/everything, /v2/top-headlines and Reddit /r/<sub>/hot.json
+    Serves payloads from a RecordReplayTransport recording when one matches, synthetic ones
+    otherwise, with configurable latency distribution, error rate and payload size
+    """
+    
+    WORDS = ("new", "study", "shows", "how", "the", "future", "of", "market", "update", "report",
+             "guide", "why", "experts", "say", "best", "launch", "review", "data", "community", "week")
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 50.0,
+                 latency_distribution: str = "lognormal", latency_sigma: float = 0.5,
+                 error_rate: float = 0.0, description_bytes: int = 200,
+                 recordings: Optional[str] = None, seed: Optional[int] = None):
+        if latency_distribution not in ("fixed", "uniform", "exponential", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.description_bytes = description_bytes
+        self.recordings = RecordReplayTransport.load(recordings) if recordings else {}
+        self.requests_served = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    @property
+    def news_base_url(self) -> str:
+        return f"{self.url}/v2"
+    
+    @property
+    def reddit_base_url(self) -> str:
+        return self.url
+    
+    def sample_latency(self) -> float:
+        """Draw one response delay in seconds; every distribution has mean latency_ms"""
+        mean = self.latency_ms / 1000
+        with self._lock:
+            if self.latency_distribution == "fixed":
+                return mean
+            if self.latency_distribution == "uniform":
+                return self._rng.uniform(0, 2 * mean)
+            if self.latency_distribution == "exponential":
+                return self._rng.expovariate(1 / mean) if mean > 0 else 0.0
+            sigma = self.latency_sigma
+            return mean * math.exp(self._rng.gauss(0, sigma) - sigma * sigma / 2)
+    
+    def respond(self, path: str, params: Dict[str, str]) -> Tuple[int, bytes]:
+        """Build the status and body for one request"""
+        with self._lock:
+            self.requests_served += 1
+            failed = self._rng.random() < self.error_rate
+        if failed:
+            return 503, b'{"error": "injected failure"}'
+        
+        recorded = self.recordings.get(RecordReplayTransport.request_key(path, params))
+        if recorded is not None:
+            return recorded[0], recorded[1].encode("utf-8")
+        
+        if path in ("/v2/everything", "/v2/top-headlines"):
+            query = params.get("q") or params.get("country", "us")
+            payload = self._synthetic_news(path, query, int(params.get("pageSize", 5)))
+        elif path.startswith("/r/") and path.endswith("/hot.json"):
+            payload = self._synthetic_reddit(path.split("/")[2], int(params.get("limit", 5)))
+        else:
+            return 404, b'{"error": "unknown endpoint"}'
+        return 200, json.dumps(payload).encode("utf-8")
+    
+    def _headline(self, rng: random.Random, topic: str) -> str:
+        return f"{topic.title()}: " + " ".join(rng.choice(self.WORDS) for _ in range(8))
+    
+    def _synthetic_news(self, path: str, query: str, page_size: int) -> Dict:
+        # Seeded by the query, so repeated requests see the same articles
+        rng = random.Random(f"{path}?{query}")
+        articles = [{
+            "source": {"name": f"Stub {rng.choice(('Wire', 'Times', 'Post', 'Daily'))}"},
+            "title": self._headline(rng, query),
+            "description": " ".join(rng.choice(self.WORDS) for _ in range(self.description_bytes // 6)),
+            "url": f"https://news.stub.local/{query}/{i}",
+            "publishedAt": datetime.now().isoformat()
+        } for i in range(min(page_size, 100))]
+        return {"status": "ok", "totalResults": len(articles), "articles": articles}
+    
+    def _synthetic_reddit(self, subreddit: str, limit: int) -> Dict:
+        rng = random.Random(f"r/{subreddit}")
+        children = [{"data": {
+            "title": self._headline(rng, subreddit),
+            "subreddit": subreddit,
+            "permalink": f"/r/{subreddit}/comments/{i:06d}/",
+            "score": rng.randint(10, 50000),
+            "created_utc": time.time() - rng.randint(0, 86400),
+            "selftext": "x" * self.description_bytes
+        }} for i in range(min(limit, 100))]
+        return {"kind": "Listing", "data": {"children": children}}
+    
+    def start(self) -> "StubAPIServer":
+        """Start serving on a background thread; port 0 picks a free port"""
+        handler = type("StubRequestHandler", (_StubRequestHandler,), {"stub": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="stub-server", daemon=True).start()
+        return self
+    
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def __enter__(self) -> "StubAPIServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+# HEADLESS BATCH MODE
+
+def character_from_dict(record: Dict, default_id: Optional[str] = None) -> Character:
+    """
+    Build a Character from a JSON record, ignoring unknown keys and applying the usual defaults
+    A record without a user_id gets default_id when given, a random id otherwise
+    """
+    if not isinstance(record, dict):
+        raise TypeError(f"expected a JSON object, got {type(record).__name__}")
+    known = {f.name for f in fields(Character)}
+    values = {key: value for key, value in record.items() if key in known}
+    if default_id is not None:
+        values.setdefault("user_id", default_id)
+    return Character(**values)
+
+def iter_jsonl(source) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, record) for each non-blank line, reporting malformed lines on stderr"""
+    for line_number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Skipping line {line_number}: invalid JSON ({e})", file=sys.stderr)
+
+def process_character(character: Character, recommender: ContentRecommender, total_items: int,
+                      streams: Optional[RandomStreams] = None,
+                      seen: Optional[Deduplicator] = None) -> Tuple[Dict[str, float], List[Recommendation]]:
+    """Run inference and feed generation for one character, reproducibly when given its streams"""
+    engine_rng = streams.child(0).python() if streams is not None else None
+    feed_rng = streams.child(1).python() if streams is not None else None
+    # A fresh engine per call: infer_algorithms keeps its result on the instance
+    weights = dict(RecommendationInferenceEngine(engine_rng).infer_algorithms(character))
+    return weights, recommender.generate_feed(character, weights, total_items, rng=feed_rng, seen=seen)
+
+def result_line(line_number: int, character: Character, weights: Dict[str, float],
+                recommendations: List[Recommendation]) -> str:
+    """One JSONL output record: input line number, character name, weights and recommendations"""
+    return json.dumps({
+        "line": line_number,
+        "character": character.name,
+        "weights": weights,
+        "recommendations": [asdict(rec) for rec in recommendations]
+    }) + "\n"
+
+def run_batch(source, output, recommender: ContentRecommender, concurrency: int = 8,
+              total_items: int = 15, seed: Optional[int] = None, sink: Optional[ExportSink] = None,
+              seen: Optional[Deduplicator] = None) -> int:
+    """
+    Stream characters from JSONL in, and weights plus recommendations as JSONL out
+    At most 2 x concurrency characters are held in memory, whatever the input size;
+    results are written as they finish, tagged with their input line number.
+    With a seed, each line draws from its own stream, so output is reproducible at any concurrency.
+    A sink additionally receives the full export record of every character, and a shared seen
+    deduplicator makes every item go out at most once across the whole run
+    """
+    streams = RandomStreams(seed) if seed is not None else None
+    failures = 0
+    
+    def export(operation: Callable[[], None]):
+        """Run a sink operation; a rejected batch is reported like a failed line and the run goes on"""
+        nonlocal failures
+        try:
+            operation()
+        except Exception as e:
+            failures += 1
+            print(f"Export to {sink.path} failed, {sink.records_failed} records dropped so far: {e}",
+                  file=sys.stderr)
+    
+    def write(line_number: int, character: Character, future):
+        nonlocal failures
+        try:
+            weights, recommendations = future.result()
+        except Exception as e:
+            failures += 1
+            print(f"Line {line_number} ({character.name}) failed: {e}", file=sys.stderr)
+            return
+        output.write(result_line(line_number, character, weights, recommendations))
+        output.flush()
+        if sink is not None:
+            export(lambda: sink.write(export_record(line_number, character, weights, recommendations)))
+    
+    # Client diagnostics go to stderr so stdout stays valid JSONL; the scoring corpus holds
+    # still until the run ends, so no line's scores depend on which lines finished before it
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as executor, \
+            contextlib.redirect_stdout(sys.stderr), recommender.frozen_corpus():
+        pending = {}
+        for line_number, record in iter_jsonl(source):
+            try:
+                character = character_from_dict(record, f"line-{line_number}")
+            except TypeError as e:
+                failures += 1
+                print(f"Line {line_number}: not a valid character ({e})", file=sys.stderr)
+                continue
+            future = executor.submit(process_character, character, recommender, total_items,
+                                     streams.child(line_number) if streams is not None else None, seen)
+            pending[future] = (line_number, character)
+            
+            # Backpressure: stop reading until some work completes
+            if len(pending) >= 2 * concurrency:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(*pending.pop(future), future)
+        
+        for future in as_completed(list(pending)):
+            write(*pending.pop(future), future)
+    
+    if sink is not None:
+        export(sink.flush)
+    return 1 if failures else 0
+
+# POPULATION SIMULATION
+
+@dataclass
+class SimulationConfig:
+    """Everything a worker process needs to build its own recommender and process a shard"""
+    api_key: str = NEWS_API_KEY
+    news_base_url: str = NEWS_API_BASE
+    reddit_base_url: str = REDDIT_API_BASE
+    replay: Optional[str] = None  # Recording to serve responses from instead of the network
+    total_items: int = 15
+    seed: Optional[int] = None
+    threads: int = 8  # Characters processed at once inside each worker
+    workers: int = 1  # Worker count, used to split per-host rate limits between processes
+
+# Per-process state, set up once by the pool initializer
+_worker_config: Optional[SimulationConfig] = None
+_worker_recommender: Optional[ContentRecommender] = None
+
+def _init_simulation_worker(config: SimulationConfig):
+    """Give each worker process its own transport, connection pools, cache and breakers"""
+    global _worker_config, _worker_recommender
+    if config.replay:
+        transport = RecordReplayTransport(config.replay, mode="replay")
+    else:
+        # Every process has its own buckets, so each gets a share of the per-host budget
+        limits = {host: (rate / config.workers, max(1.0, burst / config.workers))
+                  for host, (rate, burst) in RateLimiter.DEFAULT_LIMITS.items()}
+        transport = HTTPTransport(rate_limiter=RateLimiter(limits))
+    _worker_config = config
+    _worker_recommender = ContentRecommender(config.api_key, max_workers=config.threads, transport=transport,
+                                             cache=ResponseCache(), single_flight=SingleFlight(),
+                                             breakers=CircuitBreakerRegistry(),
+                                             news_base_url=config.news_base_url,
+                                             reddit_base_url=config.reddit_base_url)
+
+def simulate_shard(shard_id: int, records: List[Tuple[int, Dict]]) -> Tuple[int, List[str], FeedSummary, int]:
+    """Worker entry point: process one shard and return its id, output lines, summary and failure count"""
+    config, recommender = _worker_config, _worker_recommender
+    streams = RandomStreams(config.seed) if config.seed is not None else None
+    lines, summary, failures = [], FeedSummary(), 0
+    
+    # Shards land on workers in any order, so each one scores against the corpus the worker
+    # started with and leaves it untouched; a resumed run then scores every shard the same way
+    with ThreadPoolExecutor(max_workers=config.threads, thread_name_prefix="shard") as executor, \
+            contextlib.redirect_stdout(sys.stderr), recommender.frozen_corpus(commit=False):
+        jobs = []
+        for line_number, record in records:
+            try:
+                character = character_from_dict(record, f"line-{line_number}")
+            except TypeError as e:
+                failures += 1
+                print(f"Line {line_number}: not a valid character ({e})", file=sys.stderr)
+                continue
+            # Same stream per line as run_batch, so both produce identical output for a seed
+            future = executor.submit(process_character, character, recommender, config.total_items,
+                                     streams.child(line_number) if streams is not None else None)
+            jobs.append((line_number, character, future))
+        
+        for line_number, character, future in jobs:
+            try:
+                weights, recommendations = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"Line {line_number} ({character.name}) failed: {e}", file=sys.stderr)
+                continue
+            lines.append(result_line(line_number, character, weights, recommendations))
+            summary.add_feed(recommendations)
+    
+    return shard_id, lines, summary, failures
+
+class PopulationRunner:
+    """
+    Shards characters across worker processes, streams finished shards to a JSONL file in input
+    order and merges the per-shard summaries. After every shard a checkpoint records the completed
+    shards, the merged summary and the output length, so an interrupted run resumes where it
+    stopped and, for a seed, ends with the same file as an uninterrupted run
+    """
+    
+    def __init__(self, config: SimulationConfig, workers: Optional[int] = None, shard_size: int = 100,
+                 checkpoint_path: Optional[str] = None, progress: bool = True):
+        self.workers = workers or os.cpu_count() or 1
+        self.config = SimulationConfig(**dict(asdict(config), workers=self.workers))
+        self.shard_size = shard_size
+        self.checkpoint_path = checkpoint_path
+        self.progress = progress
+        self.failures = 0  # Characters that failed, including those from resumed runs
+    
+    def _shards(self, records: Iterable[Tuple[int, Dict]]) -> Iterator[Tuple[int, List[Tuple[int, Dict]]]]:
+        shard: List[Tuple[int, Dict]] = []
+        shard_id = 0
+        for record in records:
+            shard.append(record)
+            if len(shard) == self.shard_size:
+                yield shard_id, shard
+                shard, shard_id = [], shard_id + 1
+        if shard:
+            yield shard_id, shard
+    
+    def _load_checkpoint(self) -> Optional[Dict]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint["shard_size"] != self.shard_size or checkpoint["seed"] != self.config.seed:
+            raise ValueError("checkpoint was written with a different shard size or seed; "
+                             "rerun with the same settings or without resume")
+        return checkpoint
+    
+    def _save_checkpoint(self, checkpoint: Dict):
+        if not self.checkpoint_path:
+            return
+        # Write-then-rename so a crash never leaves a half-written checkpoint
+        temporary = self.checkpoint_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(temporary, self.checkpoint_path)
+    
+    def run(self, records: Iterable[Tuple[int, Dict]], output_path: str, resume: bool = False,
+            total: Optional[int] = None) -> FeedSummary:
+        """
+        Process (line number, character record) pairs and return the merged summary
+        With resume, shards completed by a previous run are skipped and output written after
+        its last checkpoint is discarded; total, when known, is only used for progress reporting
+        """
+        checkpoint = self._load_checkpoint() if resume else None
+        if checkpoint is None:
+            checkpoint = {"shard_size": self.shard_size, "seed": self.config.seed, "offset": 0,
+                          "completed": [], "failures": 0, "summary": FeedSummary().to_dict()}
+        completed = set(checkpoint["completed"])
+        summary = FeedSummary.from_dict(checkpoint["summary"])
+        
+        # Drop results of shards that finished after the last checkpoint; they are recomputed
+        with open(output_path, "a", encoding="utf-8"):
+            pass
+        os.truncate(output_path, checkpoint["offset"])
+        
+        start = time.monotonic()
+        done_before = summary.characters
+        with open(output_path, "a", encoding="utf-8") as output, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=_init_simulation_worker,
+                                    initargs=(self.config,)) as executor:
+            
+            # Shards finish in any order but are written in submission order; finished shards
+            # wait in ready until every earlier one is written
+            order: deque = deque()
+            ready: Dict[int, Tuple] = {}
+            
+            def collect(future):
+                result = future.result()
+                ready[result[0]] = result
+                while order and order[0] in ready:
+                    shard_id, lines, shard_summary, failures = ready.pop(order.popleft())
+                    output.writelines(lines)
+                    output.flush()
+                    os.fsync(output.fileno())
+                    summary.merge(shard_summary)
+                    completed.add(shard_id)
+                    checkpoint.update(offset=output.tell(), completed=sorted(completed),
+                                      failures=checkpoint["failures"] + failures, summary=summary.to_dict())
+                    self._save_checkpoint(checkpoint)
+                    self._report(summary.characters, done_before, total, start)
+            
+            pending = set()
+            for shard_id, shard in self._shards(records):
+                if shard_id in completed:
+                    continue
+                order.append(shard_id)
+                pending.add(executor.submit(simulate_shard, shard_id, shard))
+                # Backpressure: at most two shards per worker submitted and not yet written
+                while len(order) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+            for future in as_completed(pending):
+                collect(future)
+        
+        if self.progress:
+            print(file=sys.stderr)
+        self.failures = checkpoint["failures"]
+        return summary
+    
+    def _report(self, done: int, done_before: int, total: Optional[int], start: float):
+        """One-line progress on stderr: characters done, throughput and, with a known total, ETA"""
+        if not self.progress:
+            return
+        elapsed = time.monotonic() - start
+        rate = (done - done_before) / elapsed if elapsed > 0 else 0.0
+        line = f"\r  {done}" + (f"/{total}" if total else "") + f" characters, {rate:.1f}/s"
+        if total and rate > 0:
+            line += f", ETA {max(0.0, (total - done) / rate):.0f}s"
+        print(line, end="", file=sys.stderr, flush=True)
+
+def run_simulation(args: argparse.Namespace) -> int:
+    """Run the population simulation subcommand and print the merged summary"""
+    config = SimulationConfig(api_key=args.api_key, news_base_url=args.news_base_url,
+                              reddit_base_url=args.reddit_base_url, replay=args.replay,
+                              total_items=args.items, seed=args.seed, threads=args.threads)
+    runner = PopulationRunner(config, workers=args.workers, shard_size=args.shard_size,
+                              checkpoint_path=args.checkpoint or args.output + ".checkpoint.json")
+    
+    if args.population is not None:
+        records = ((i + 1, asdict(character))
+                   for i, character in enumerate(iter_population(args.population, args.population_seed)))
+        summary = runner.run(records, args.output, resume=args.resume, total=args.population)
+    else:
+        with open(args.input, encoding="utf-8") as source:
+            summary = runner.run(iter_jsonl(source), args.output, resume=args.resume)
+    
+    display_population_summary(summary)
+    print(f"\nResults written to {args.output}")
+    return 1 if runner.failures else 0
+
+def build_recommender(args: argparse.Namespace) -> ContentRecommender:
+    """Create the recommender for a headless run, honouring base URL and record/replay options"""
+    transport = None
+    if args.replay:
+        transport = RecordReplayTransport(args.replay, mode="replay")
+    elif args.record:
+        transport = RecordReplayTransport(args.record, mode="record")
+    return ContentRecommender(args.api_key, max_workers=args.concurrency, transport=transport,
+                              news_base_url=args.news_base_url, reddit_base_url=args.reddit_base_url)
+
+def run_stub_server(args: argparse.Namespace) -> int:
+    """Serve stub API responses until interrupted"""
+    server = StubAPIServer(host=args.host, port=args.port, latency_ms=args.latency_ms,
+                           latency_distribution=args.latency_distribution, error_rate=args.error_rate,
+                           description_bytes=args.description_bytes, recordings=args.recordings,
+                           seed=args.seed).start()
+    print(f"Stub API server listening on {server.url}")
+    print(f"  --news-base-url {server.news_base_url} --reddit-base-url {server.reddit_base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"Served {server.requests_served} requests")
+    return 0
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Command-line interface: interactive by default, or one of the headless subcommands"""
+    parser = argparse.ArgumentParser(description="Reverse-Inference Recommendation System")
+    subcommands = parser.add_subparsers(dest="command")
+    
+    batch = subcommands.add_parser("batch", help="Process characters from JSONL without prompts")
+    batch.add_argument("--input", "-i", default="-", help="JSONL file of characters ('-' for stdin)")
+    batch.add_argument("--concurrency", "-c", type=int, default=8, help="Characters processed at once")
+    batch.add_argument("--items", "-n", type=int, default=15, help="Recommendations per character")
+    batch.add_argument("--api-key", default=NEWS_API_KEY, help="NewsAPI key")
+    batch.add_argument("--news-base-url", default=NEWS_API_BASE, help="NewsAPI base URL (e.g. a stub server)")
+    batch.add_argument("--reddit-base-url", default=REDDIT_API_BASE, help="Reddit base URL")
+    recording = batch.add_mutually_exclusive_group()
+    recording.add_argument("--record", metavar="FILE", help="Record upstream responses to a JSONL file")
+    recording.add_argument("--replay", metavar="FILE", help="Replay recorded responses, no network")
+    batch.add_argument("--seed", type=int, default=None, help="Root seed for reproducible weights and feeds")
+    batch.add_argument("--export", metavar="FILE",
+                       help="Also export full records; format from the extension (.jsonl, .jsonl.gz, .parquet, .arrow)")
+    batch.add_argument("--append", action="store_true", help="Add to an existing export instead of replacing it")
+    batch.add_argument("--export-batch-size", type=int, default=1000, help="Records buffered per export write")
+    batch.add_argument("--dedupe-across-run", type=int, metavar="CAPACITY", default=None,
+                       help="Send each item at most once per run, tracked in a Bloom filter sized for CAPACITY items")
+    batch.add_argument("--warm-collaborative", type=int, metavar="N", default=None,
+                       help="Train the collaborative model on N simulated characters before processing")
+    batch.add_argument("--metrics", metavar="FILE",
+                       help="Record timings and counters and write them here in Prometheus text format")
+    
+    simulate = subcommands.add_parser("simulate", help="Simulate a population across worker processes")
+    population = simulate.add_mutually_exclusive_group(required=True)
+    population.add_argument("--input", "-i", help="JSONL file of characters")
+    population.add_argument("--population", "-p", type=int, help="Generate this many random characters")
+    simulate.add_argument("--population-seed", type=int, default=0, help="Seed for the generated population")
+    simulate.add_argument("--output", "-o", required=True, help="JSONL file the results are written to")
+    simulate.add_argument("--workers", "-w", type=int, default=None, help="Worker processes (default: CPUs)")
+    simulate.add_argument("--shard-size", type=int, default=100, help="Characters per shard")
+    simulate.add_argument("--threads", type=int, default=8, help="Characters processed at once per worker")
+    simulate.add_argument("--items", "-n", type=int, default=15, help="Recommendations per character")
+    simulate.add_argument("--seed", type=int, default=None, help="Root seed for reproducible weights and feeds")
+    simulate.add_argument("--api-key", default=NEWS_API_KEY, help="NewsAPI key")
+    simulate.add_argument("--news-base-url", default=NEWS_API_BASE, help="NewsAPI base URL")
+    simulate.add_argument("--reddit-base-url", default=REDDIT_API_BASE, help="Reddit base URL")
+    simulate.add_argument("--replay", metavar="FILE", help="Replay recorded responses, no network")
+    simulate.add_argument("--checkpoint", metavar="FILE", help="Checkpoint file (default: OUTPUT.checkpoint.json)")
+    simulate.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoint")
+    
+    stub = subcommands.add_parser("stub-server", help="Serve synthetic or recorded NewsAPI/Reddit responses")
+    stub.add_argument("--host", default="127.0.0.1")
+    stub.add_argument("--port", type=int, default=8080)
+    stub.add_argument("--latency-ms", type=float, default=50.0, help="Mean response latency")
+    stub.add_argument("--latency-distribution", default="lognormal",
+                      choices=["fixed", "uniform", "exponential", "lognormal"])
+    stub.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    stub.add_argument("--description-bytes", type=int, default=200, help="Approximate text size per item")
+    stub.add_argument("--recordings", metavar="FILE", help="Serve responses from a recording when they match")
+    stub.add_argument("--seed", type=int, default=None)
+    
+    return parser
+
+def main(argv: Optional[List[str]] = None):
     """Main program entry point"""
+    args = build_arg_parser().parse_args(argv)
+    
+    if args.command == "batch":
+        registry = enable_metrics() if args.metrics else None
+        sink = open_sink(args.export, args.append, args.export_batch_size) if args.export else None
+        seen = Deduplicator(BloomFilter(args.dedupe_across_run)) if args.dedupe_across_run else None
+        recommender = build_recommender(args)
+        if args.warm_collaborative:
+            population = generate_population(args.warm_collaborative, seed=args.seed or 0)
+            # Input line numbers start at 1, so the root's stream 0 is free for the warm-up
+            streams = RandomStreams(args.seed).child(0) if args.seed is not None else None
+            with contextlib.redirect_stdout(sys.stderr):
+                model = BatchFeedPlanner(recommender).warm_collaborative(population, args.items, streams)
+            print(f"Collaborative model: {model.stats()}", file=sys.stderr)
+        try:
+            if args.input == "-":
+                return run_batch(sys.stdin, sys.stdout, recommender, args.concurrency, args.items, args.seed,
+                                 sink, seen)
+            with open(args.input, encoding="utf-8") as source:
+                return run_batch(source, sys.stdout, recommender, args.concurrency, args.items, args.seed,
+                                 sink, seen)
+        finally:
+            recommender.close()
+            if sink is not None:
+                sink.close()
+            if registry is not None:
+                with open(args.metrics, "w", encoding="utf-8") as f:
+                    f.write(registry.to_prometheus())
+    if args.command == "simulate":
+        return run_simulation(args)
+    if args.command == "stub-server":
+        return run_stub_server(args)
+    
     print(" Starting Reverse-Inference Recommendation System...")
     print("\n Note: For real content, add your NewsAPI key to the NEWS_API_KEY variable.")
     print("    Get a free key at: https://newsapi.org/register")
@@ -988,4 +4563,4 @@ def main():
         # If result == "restart", the loop will continue
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
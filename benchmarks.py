@@ -0,0 +1,223 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from RecommenderLab_Cl import (
+    ContentRecommender,
+    RecommendationInferenceEngine,
+    ResponseCache,
+    SingleFlight,
+    CircuitBreakerRegistry,
+    HTTPTransport,
+    StubAPIServer,
+    display_summary_stats,
+    export_results,
+    generate_population,
+    np,
+)
+
+
+# BENCHMARK HARNESS
+
+def measure(fn: Callable[[], object], repeat: int = 3) -> List[float]:
+    """Run fn repeat times and return the wall-clock duration of each run"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+def result_row(name: str, size: int, durations: List[float], items: Optional[int] = None,
+               latencies: Optional[List[float]] = None) -> Dict:
+    """Summarize a benchmark: best and median run time, throughput and optional per-call latencies"""
+    best = min(durations)
+    items = size if items is None else items
+    row = {
+        "name": name,
+        "size": size,
+        "best_seconds": best,
+        "median_seconds": statistics.median(durations),
+        "items_per_second": items / best if best > 0 else float("inf")
+    }
+    if latencies:
+        ordered = sorted(latencies)
+        row["latency_p50"] = ordered[len(ordered) // 2]
+        row["latency_p95"] = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return row
+
+def quiet():
+    """Silence the prints of the functions under test"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+# BENCHMARKS
+
+def bench_inference(sizes: List[int], repeat: int) -> List[Dict]:
+    """Scalar infer_algorithms in a loop vs. the vectorized batch path"""
+    rows = []
+    for size in sizes:
+        population = generate_population(size, seed=size)
+        engine = RecommendationInferenceEngine()
+        rows.append(result_row("inference_scalar", size, measure(
+            lambda: [engine.infer_algorithms(character) for character in population], repeat)))
+        if np is not None:
+            columns = engine.columns_from_characters(population)
+            rows.append(result_row("inference_batch", size, measure(
+                lambda: engine.infer_algorithms_batch(columns), repeat)))
+    return rows
+
+def bench_feeds(sizes: List[int], repeat: int, latency_ms: float) -> List[Dict]:
+    """generate_feed against a local stub server, cold and warm cache, sequential and concurrent"""
+    rows = []
+    with StubAPIServer(latency_ms=latency_ms, seed=0) as server:
+        for size in sizes:
+            population = generate_population(size, seed=size)
+            engine = RecommendationInferenceEngine()
+            weights = [dict(engine.infer_algorithms(character)) for character in population]
+
+            for mode, concurrent, warm in (("sequential_cold", False, False),
+                                           ("concurrent_cold", True, False),
+                                           ("concurrent_warm", True, True)):
+                latencies = []
+
+                def run() -> float:
+                    """Time the feeds only, not recommender setup or cache warming"""
+                    recommender = ContentRecommender(
+                        "benchmark-key", transport=HTTPTransport(max_retries=0), cache=ResponseCache(),
+                        single_flight=SingleFlight(), breakers=CircuitBreakerRegistry(),
+                        news_base_url=server.news_base_url, reddit_base_url=server.reddit_base_url)
+                    if warm:
+                        for character, algorithm_weights in zip(population, weights):
+                            recommender.generate_feed(character, algorithm_weights, 15)
+                    run_start = time.perf_counter()
+                    for character, algorithm_weights in zip(population, weights):
+                        start = time.perf_counter()
+                        recommender.generate_feed(character, algorithm_weights, 15, concurrent=concurrent)
+                        latencies.append(time.perf_counter() - start)
+                    elapsed = time.perf_counter() - run_start
+                    recommender.close()
+                    return elapsed
+
+                durations = []
+                with quiet():
+                    for _ in range(repeat):
+                        latencies.clear()
+                        durations.append(run())
+                rows.append(result_row(f"feed_{mode}", size, durations, latencies=latencies))
+    return rows
+
+def build_session(size: int):
+    """One character's weights plus a feed of `size` recommendations, for the reporting benchmarks"""
+    population = generate_population(1, seed=0)
+    character = population[0]
+    weights = dict(RecommendationInferenceEngine().infer_algorithms(character))
+    with StubAPIServer(latency_ms=0, latency_distribution="fixed") as server, quiet():
+        recommender = ContentRecommender("benchmark-key", cache=ResponseCache(),
+                                         news_base_url=server.news_base_url,
+                                         reddit_base_url=server.reddit_base_url)
+        feed = recommender.generate_feed(character, weights, 40)
+        recommender.close()
+    recommendations = (feed * (size // max(1, len(feed)) + 1))[:size]
+    return character, weights, recommendations
+
+def bench_reporting(sizes: List[int], repeat: int) -> List[Dict]:
+    """display_summary_stats-style aggregation and export_results over growing feeds"""
+    rows = []
+    for size in sizes:
+        character, weights, recommendations = build_session(size)
+        with quiet():
+            rows.append(result_row("summary_stats", size, measure(
+                lambda: display_summary_stats(character, weights, recommendations), repeat)))
+        with tempfile.TemporaryDirectory() as directory, quiet():
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                rows.append(result_row("export_results", size, measure(
+                    lambda: export_results(character, weights, recommendations), repeat)))
+            finally:
+                os.chdir(cwd)
+    return rows
+
+
+# RESULTS
+
+def environment() -> Dict:
+    """Describe the machine and revision a run was taken on"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__ if np is not None else None
+    }
+
+def compare(current: List[Dict], baseline_path: str, threshold: float) -> List[str]:
+    """List benchmarks whose best time regressed by more than threshold (a fraction) vs. a saved run"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(row["name"], row["size"]): row for row in json.load(f)["results"]}
+    regressions = []
+    for row in current:
+        previous = baseline.get((row["name"], row["size"]))
+        if previous and row["best_seconds"] > previous["best_seconds"] * (1 + threshold):
+            regressions.append(f"{row['name']}[{row['size']}]: {previous['best_seconds']:.4f}s -> "
+                               f"{row['best_seconds']:.4f}s")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for the Reverse-Inference Recommendation System")
+    parser.add_argument("--suite", nargs="+", default=["inference", "feeds", "reporting"],
+                        choices=["inference", "feeds", "reporting"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000],
+                        help="Population sizes for inference, feed counts for reporting")
+    parser.add_argument("--feed-sizes", nargs="+", type=int, default=[10, 50],
+                        help="Number of characters whose feeds are generated")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean stub server latency")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to save the JSON results")
+    parser.add_argument("--compare", metavar="FILE", help="Previous results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before flagging")
+    args = parser.parse_args(argv)
+
+    results = []
+    if "inference" in args.suite:
+        results += bench_inference(args.sizes, args.repeat)
+    if "feeds" in args.suite:
+        results += bench_feeds(args.feed_sizes, args.repeat, args.latency_ms)
+    if "reporting" in args.suite:
+        results += bench_reporting(args.sizes, args.repeat)
+
+    for row in results:
+        latency = f"  p50 {row['latency_p50'] * 1000:7.1f}ms  p95 {row['latency_p95'] * 1000:7.1f}ms" \
+            if "latency_p50" in row else ""
+        print(f"{row['name']:24} {row['size']:>7}  {row['best_seconds']:9.4f}s  "
+              f"{row['items_per_second']:12.1f}/s{latency}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
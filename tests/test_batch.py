@@ -0,0 +1,49 @@
+import io
+import json
+
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+@pytest.fixture
+def recommender():
+    with lab.StubAPIServer(latency_ms=0, latency_distribution="fixed") as server:
+        recommender = lab.ContentRecommender("test-key", news_base_url=server.news_base_url,
+                                             reddit_base_url=server.reddit_base_url)
+        yield recommender
+        recommender.close()
+
+
+@pytest.mark.parametrize("record", [[1], "x", None, 3])
+def test_character_from_dict_rejects_non_objects(record):
+    with pytest.raises(TypeError):
+        lab.character_from_dict(record)
+
+def character_line(name):
+    return json.dumps({"name": name, "age": 30, "gender": "Female", "location": "London, UK",
+                       "occupation": "Engineer", "interests": ["technology"],
+                       "personality_traits": ["curious"]}) + "\n"
+
+def test_run_batch_skips_lines_that_are_not_objects(recommender, capsys):
+    source = io.StringIO(character_line("Ada") + '[1]\n"x"\nnull\n' + character_line("Bob"))
+    output = io.StringIO()
+    status = lab.run_batch(source, output, recommender, concurrency=2, total_items=5, seed=1)
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert status == 1
+    assert sorted(line["line"] for line in lines) == [1, 5]
+    assert capsys.readouterr().err.count("not a valid character") == 3
+
+def test_seeded_run_is_identical_at_any_concurrency():
+    source = "".join(json.dumps(lab.asdict(character)) + "\n" for character in lab.generate_population(20, seed=5))
+    outputs = []
+    with lab.StubAPIServer(latency_ms=0, latency_distribution="fixed") as server:
+        for concurrency in (1, 6):
+            # A fresh recommender each time: a finished run adds its feeds to the scoring corpus
+            recommender = lab.ContentRecommender("test-key", news_base_url=server.news_base_url,
+                                                 reddit_base_url=server.reddit_base_url)
+            output = io.StringIO()
+            lab.run_batch(io.StringIO(source), output, recommender, concurrency=concurrency, total_items=10, seed=3)
+            recommender.close()
+            outputs.append(sorted(output.getvalue().splitlines()))
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,35 @@
+import RecommenderLab_Cl as lab
+
+
+class CountingTransport(lab.HTTPTransport):
+    def __init__(self):
+        super().__init__(max_retries=0)
+        self.urls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.urls.append((url, tuple(sorted((params or {}).items()))))
+        return super().get(url, params=params, headers=headers, timeout=timeout)
+
+
+def test_planned_queries_fetched_once_and_clients_untouched():
+    characters = lab.generate_population(30, seed=3)
+    engine = lab.RecommendationInferenceEngine()
+    weights = [dict(engine.infer_algorithms(character)) for character in characters]
+    transport = CountingTransport()
+    with lab.StubAPIServer(latency_ms=0, latency_distribution="fixed") as server:
+        # A cache far smaller than the plan: the batch must not depend on it retaining entries
+        recommender = lab.ContentRecommender(
+            "test-key", transport=transport, cache=lab.ResponseCache(max_entries=2),
+            single_flight=lab.SingleFlight(), breakers=lab.CircuitBreakerRegistry(),
+            news_base_url=server.news_base_url, reddit_base_url=server.reddit_base_url)
+        planner = lab.BatchFeedPlanner(recommender)
+        queries = planner.plan(characters, weights, 15)
+        feeds = planner.generate_feeds(characters, weights, 15)
+        recommender.close()
+
+    planned = sum(len(kind) for kind in queries.values())
+    assert len(feeds) == len(characters)
+    assert len(transport.urls) == len(set(transport.urls)) == planned
+    assert recommender.news_client.page_size is None
+    assert recommender.reddit_client.page_size is None
+    assert lab.BATCH_SCOPE.get() is None
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=b'{"ok": true}'):
+        self.status_code = status_code
+        self.content = content
+
+    def json(self):
+        return {"ok": True}
+
+class QueuedTransport:
+    """Spends most of each call queued in the rate limiter, then answers quickly"""
+
+    def __init__(self, queued=0.3, status_code=200):
+        self.queued = queued
+        self.status_code = status_code
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        time.sleep(self.queued)
+        lab.RATE_LIMIT_WAIT.set(self.queued)
+        self.calls += 1
+        return FakeResponse(self.status_code)
+
+def make_client(transport, **breaker_settings):
+    breakers = lab.CircuitBreakerRegistry(**breaker_settings)
+    client = lab.BaseAPIClient({}, transport=transport, single_flight=lab.SingleFlight(), breakers=breakers)
+    return client, breakers.get("base/hot")
+
+
+def test_rate_limiter_wait_is_not_slow_call():
+    client, breaker = make_client(QueuedTransport(queued=0.3), slow_call_seconds=0.2, min_calls=2)
+    for i in range(4):
+        client._fetch_json("hot", f"http://upstream/{i}", {})
+    assert breaker.state == breaker.CLOSED
+    assert breaker.stats()["p50_latency"] < 0.2
+
+def test_server_errors_open_circuit():
+    client, breaker = make_client(QueuedTransport(queued=0.0, status_code=503), min_calls=2)
+    for i in range(2):
+        with pytest.raises(lab.APIResponseError):
+            client._fetch_json("hot", f"http://upstream/{i}", {})
+    assert breaker.state == breaker.OPEN
+    with pytest.raises(lab.CircuitOpenError):
+        client._fetch_json("hot", "http://upstream/2", {})
+
+def test_client_errors_keep_circuit_closed():
+    client, breaker = make_client(QueuedTransport(queued=0.0, status_code=404), min_calls=2)
+    for i in range(4):
+        with pytest.raises(lab.APIResponseError):
+            client._fetch_json("hot", f"http://upstream/{i}", {})
+    assert breaker.state == breaker.CLOSED
+
+def test_coalesced_callers_record_one_call():
+    transport = QueuedTransport(queued=0.2)
+    client, breaker = make_client(transport)
+    threads = [threading.Thread(target=client._fetch_json, args=("hot", "http://upstream/same", {}))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert transport.calls == 1
+    assert breaker.stats()["recent_calls"] == 1
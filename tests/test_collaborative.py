@@ -0,0 +1,58 @@
+import itertools
+
+import RecommenderLab_Cl as lab
+
+
+def rec(title):
+    return lab.Recommendation(title=f"{title} story", source="Reddit - r/test", url=f"https://example.com/{title}",
+                              algorithm="Content-Based", score=0.8)
+
+def make_recommender(items):
+    recommender = lab.ContentRecommender("", collaborative=lab.ItemItemCF())
+    recommender.scorer = None
+    recommender._feed_tasks = lambda character, per_algorithm, rng: [
+        ("content_based", lambda character, limit: list(items), len(items))]
+    recommender._items_per_algorithm = lambda weights, total: {"content_based": total}
+    return recommender
+
+def served_items(model, user):
+    return len(model._user_items.get(user, ()))
+
+
+def test_same_name_users_keep_separate_histories():
+    first, second = lab.generate_population(2, seed=0)
+    second.name = first.name
+    assert first.user_id != second.user_id
+    recommender = make_recommender([rec("a"), rec("b"), rec("c")])
+    recommender.generate_feed(first, {"content_based": 1.0}, 3)
+    recommender.close()
+    model = recommender.collaborative
+    assert served_items(model, first.user_id) == 3
+    assert served_items(model, second.user_id) == 0
+
+def test_aborted_stream_learns_only_consumed_items():
+    character = lab.generate_population(1, seed=0)[0]
+    recommender = make_recommender([rec("a"), rec("b"), rec("c"), rec("d")])
+    stream = recommender.iter_feed(character, {"content_based": 1.0}, 4)
+    list(itertools.islice(stream, 2))  # Takes a, asks for more, takes b and stops
+    stream.close()
+    recommender.close()
+    assert served_items(recommender.collaborative, character.user_id) == 1
+
+def test_exhausted_stream_learns_everything():
+    character = lab.generate_population(1, seed=0)[0]
+    recommender = make_recommender([rec("a"), rec("b"), rec("c")])
+    assert len(list(recommender.iter_feed(character, {"content_based": 1.0}, 3))) == 3
+    recommender.close()
+    assert served_items(recommender.collaborative, character.user_id) == 3
+
+def test_batch_lines_get_line_ids_and_seeded_populations_stable_ids():
+    assert lab.character_from_dict({"name": "A", "age": 1, "gender": "", "location": "", "occupation": "",
+                                    "interests": [], "personality_traits": []}, "line-7").user_id == "line-7"
+    assert [c.user_id for c in lab.generate_population(2, seed=5)] == ["sim-5-0", "sim-5-1"]
+
+def test_characters_with_the_same_profile_compare_equal():
+    first, second = (lab.Character("a", 1, "", "", "", [], []) for _ in range(2))
+    assert first.user_id != second.user_id
+    assert first == second
+    assert first.user_id not in repr(first)
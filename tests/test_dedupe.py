@@ -0,0 +1,49 @@
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+def rec(title, url="#"):
+    return lab.Recommendation(title=title, source="NewsAPI - Test", url=url, algorithm="Content-Based", score=0.8)
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("https://www.Example.com/story/?utm_source=x&id=7#comments", "example.com/story?id=7"),
+    ("http://example.com/story", "example.com/story"),
+    ("https://example.com/?fbclid=abc", "example.com/"),
+    ("#", ""),
+    ("", ""),
+])
+def test_canonical_url(url, canonical):
+    assert lab.canonical_url(url) == canonical
+
+def test_same_story_under_tracking_urls_or_punctuated_titles_is_one_item():
+    dedupe = lab.Deduplicator()
+    kept = dedupe.filter([
+        rec("Rust 2.0 released today", "https://example.com/rust?utm_campaign=a"),
+        rec("Rust 2.0 released today!", "https://www.example.com/rust/"),
+        rec("rust 2 0 released   TODAY", "https://other.example.org/copy"),
+        rec("Something else entirely", "https://example.com/other"),
+    ])
+    assert [r.url for r in kept] == ["https://example.com/rust?utm_campaign=a", "https://example.com/other"]
+    assert dedupe.duplicates == 2
+
+def test_short_generic_titles_are_not_keys():
+    dedupe = lab.Deduplicator()
+    assert len(dedupe.filter([rec("Trending now"), rec("Trending now")])) == 2
+
+@pytest.mark.parametrize("seen", [lab.ExactSeenSet, lambda: lab.BloomFilter(capacity=1000, error_rate=0.01)])
+def test_seen_sets_report_repeats(seen):
+    keys = seen()
+    assert keys.add(42) is False
+    assert keys.add(42) is True
+
+def test_bloom_filter_false_positive_rate_near_target():
+    # Real keys are 64-bit hashes, which the double hashing relies on
+    keys = [lab._key_hash("url", f"example.com/{i}") for i in range(12_000)]
+    bloom = lab.BloomFilter(capacity=10_000, error_rate=0.01)
+    for key in keys[:10_000]:
+        bloom.add(key)
+    assert all(bloom.add(key) for key in keys[:10_000:97])
+    false_positives = sum(bloom.add(key) for key in keys[10_000:])
+    assert false_positives / 2_000 < 0.03
@@ -0,0 +1,27 @@
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+def rec(title, algorithm="Content-Based"):
+    return lab.Recommendation(title=title, source="Reddit - r/test", url="#", algorithm=algorithm, score=0.8)
+
+
+def test_display_consumes_a_stream(capsys):
+    stream = (r for r in [rec("one"), rec("two", "Collaborative"), rec("three")])
+    shown = lab.display_recommendations(stream)
+    out = capsys.readouterr().out
+    assert [r.title for r in shown] == ["one", "two", "three"]
+    assert "CONTENT-BASED RECOMMENDATIONS" in out and "COLLABORATIVE RECOMMENDATIONS" in out
+    assert "Content-Based: 2 items, Collaborative: 1 items" in out
+
+def test_display_keeps_items_shown_before_an_error():
+    def failing():
+        yield rec("one")
+        yield rec("two")
+        raise RuntimeError("source failed")
+
+    shown = []
+    with pytest.raises(RuntimeError):
+        lab.display_recommendations(failing(), shown)
+    assert [r.title for r in shown] == ["one", "two"]
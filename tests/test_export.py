@@ -0,0 +1,84 @@
+import io
+import json
+
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+class RejectingSink(lab.ExportSink):
+    """Rejects every other batch, like a columnar writer refusing a record it cannot convert"""
+
+    def __init__(self):
+        super().__init__("rejecting", batch_size=1)
+        self.batches = 0
+        self.written = []
+
+    def _write_batch(self, records):
+        self.batches += 1
+        if self.batches % 2 == 0:
+            raise ValueError("cannot convert")
+        self.written.extend(records)
+
+
+def character_line(name):
+    return json.dumps({"name": name, "age": 30, "gender": "Female", "location": "London, UK",
+                       "occupation": "Engineer", "interests": ["technology"],
+                       "personality_traits": ["curious"]}) + "\n"
+
+def test_sink_failure_does_not_abort_batch(capsys):
+    source = io.StringIO("".join(character_line(f"User {i}") for i in range(4)))
+    output = io.StringIO()
+    sink = RejectingSink()
+    with lab.StubAPIServer(latency_ms=0, latency_distribution="fixed") as server:
+        recommender = lab.ContentRecommender("test-key", news_base_url=server.news_base_url,
+                                             reddit_base_url=server.reddit_base_url)
+        status = lab.run_batch(source, output, recommender, concurrency=2, total_items=5, seed=1, sink=sink)
+        recommender.close()
+    assert status == 1
+    assert len(output.getvalue().splitlines()) == 4
+    assert len(sink.written) == 2 and sink.records_failed == 2
+    assert capsys.readouterr().err.count("Export to rejecting failed") == 2
+
+def test_failed_flush_drops_batch_instead_of_retrying():
+    sink = RejectingSink()
+    sink.write({"line": 1})
+    with pytest.raises(ValueError):
+        sink.write({"line": 2})
+    sink.write({"line": 3})
+    assert [record["line"] for record in sink.written] == [1, 3]
+    assert sink.records_written == 2 and sink.records_failed == 1
+
+@pytest.mark.skipif(lab.pa is None, reason="columnar export needs pyarrow")
+def test_arrow_sink_rejects_bad_batch_and_keeps_good_ones(tmp_path):
+    character = lab.generate_population(1, seed=0)[0]
+    good = lab.export_record(1, character, {"content_based": 1.0}, [])
+    bad = dict(good, character=dict(good["character"], age="not a number"))
+    path = str(tmp_path / "out.parquet")
+    with lab.open_sink(path, batch_size=1) as sink:
+        sink.write(good)
+        with pytest.raises(Exception):
+            sink.write(bad)
+        sink.write(good)
+    assert lab.pq.read_table(path).num_rows == 2
+
+def test_jsonl_sink_closes_file_when_final_flush_fails(tmp_path):
+    sink = lab.JSONLSink(str(tmp_path / "out.jsonl"))
+    sink.write({"line": 1, "unserializable": object()})
+    with pytest.raises(TypeError):
+        sink.close()
+    assert sink._file.closed
+    assert sink.records_failed == 1
+
+@pytest.mark.skipif(lab.pa is None, reason="columnar export needs pyarrow")
+def test_arrow_sink_closes_writer_when_final_flush_fails(tmp_path):
+    character = lab.generate_population(1, seed=0)[0]
+    good = lab.export_record(1, character, {"content_based": 1.0}, [])
+    bad = dict(good, character=dict(good["character"], age="not a number"))
+    path = str(tmp_path / "out.parquet")
+    with pytest.raises(Exception):
+        with lab.open_sink(path) as sink:
+            sink.write(good)
+            sink.write(bad)
+    assert sink.records_failed == 2
+    assert lab.pq.read_table(path).num_rows == 0
@@ -0,0 +1,43 @@
+import time
+
+import RecommenderLab_Cl as lab
+
+
+def make_recommender(tasks):
+    recommender = lab.ContentRecommender("")
+    recommender._feed_tasks = lambda character, items, rng: tasks
+    return recommender
+
+def fast(character, limit, rng=None):
+    return []
+
+def slow(character, limit, rng=None):
+    # Like the real branches, the deadline fallback answers from the cache without waiting
+    if lab.REQUEST_MODE.get() != "cache_only":
+        time.sleep(0.5)
+    return []
+
+
+def test_hedge_wakeup_does_not_spin(monkeypatch):
+    calls = []
+    real_wait = lab.wait
+
+    def counting_wait(*args, **kwargs):
+        calls.append(1)
+        return real_wait(*args, **kwargs)
+
+    monkeypatch.setattr(lab, "wait", counting_wait)
+    recommender = make_recommender([("content_based", fast, 1), ("popularity", slow, 1)])
+    character = lab.generate_population(1, seed=0)[0]
+    result = recommender.generate_feed_result(character, {"content_based": 1.0}, 5, hedge_after=0.05)
+    recommender.close()
+    assert result.hedged_branches == ["popularity"]
+    assert len(calls) < 10
+
+def test_budget_cuts_slow_branch():
+    recommender = make_recommender([("content_based", fast, 1), ("popularity", slow, 1)])
+    character = lab.generate_population(1, seed=0)[0]
+    result = recommender.generate_feed_result(character, {"content_based": 1.0}, 5, budget=0.1)
+    recommender.close()
+    assert result.cut_branches == ["popularity"]
+    assert result.elapsed < 0.4
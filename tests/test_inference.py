@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+import RecommenderLab_Cl as lab
+
+pytestmark = pytest.mark.skipif(lab.np is None, reason="batch inference and CharacterTable need NumPy")
+
+
+class ZeroNoise:
+    """Stands in for both random.Random and np.random.Generator with the noise step switched off"""
+
+    def uniform(self, low, high, size=None):
+        return 0.0 if size is None else lab.np.zeros(size)
+
+
+def population():
+    characters = lab.generate_population(2000, seed=7)
+    characters += [
+        lab.Character("Unknowns", 30, "Other", "", "", [], [], activity_level="sometimes",
+                      tech_savviness="expert", education_level="phd"),
+        lab.Character("Teen", 16, "Female", "Oslo, Norway", "", ["a", "b", "c", "d", "e", "f"],
+                      ["w", "x", "y", "z"], activity_level="high", tech_savviness="high"),
+        lab.Character("Retired", 70, "Male", "", "Retired", ["gardening"], ["calm"],
+                      activity_level="low", tech_savviness="low", education_level="other")
+    ]
+    return characters
+
+def scalar_weights(characters, rng):
+    engine = lab.RecommendationInferenceEngine(rng)
+    return lab.np.array([[engine.infer_algorithms(c)[algo] for algo in engine.ALGORITHMS] for c in characters])
+
+
+@pytest.mark.parametrize("columns", [lab.RecommendationInferenceEngine.columns_from_characters,
+                                     lambda characters: lab.CharacterTable.from_characters(characters)
+                                     .inference_columns()])
+def test_batch_matches_scalar_without_noise(columns):
+    characters = population()
+    batch = lab.RecommendationInferenceEngine().infer_algorithms_batch(columns(characters), rng=ZeroNoise())
+    assert lab.np.abs(batch - scalar_weights(characters, ZeroNoise())).max() == 0.0
+
+def test_batch_column_means_match_scalar_with_noise():
+    characters = population()
+    columns = lab.RecommendationInferenceEngine.columns_from_characters(characters)
+    engine = lab.RecommendationInferenceEngine()
+    batch = engine.infer_algorithms_batch(columns, rng=lab.RandomStreams(1).numpy())
+    scalar = scalar_weights(characters, random.Random(1))
+    assert lab.np.allclose(batch.sum(axis=1), 1.0)
+    assert not lab.np.allclose(batch, engine.infer_algorithms_batch(columns, rng=ZeroNoise()))
+    assert lab.np.abs(batch.mean(axis=0) - scalar.mean(axis=0)).max() < 0.005
+
+
+def test_character_table_round_trip():
+    characters = population()
+    table = lab.CharacterTable.from_characters(characters)
+    assert len(table) == len(characters)
+    restored = table.to_characters()
+    assert restored == characters
+    assert [c.user_id for c in restored] == [c.user_id for c in characters]
+
+def test_character_row_reads_like_a_character():
+    characters = population()
+    table = lab.CharacterTable.from_characters(characters)
+    row = table[-3]
+    assert row.name == "Unknowns" and row.age == 30
+    assert row.tech_savviness == "expert" and row.location == "" and row.interests == []
+    assert table[1].interests == characters[1].interests
+    assert row.to_character() == characters[-3]
+    with pytest.raises(AttributeError):
+        row.favourite_colour
+    with pytest.raises(IndexError):
+        table[len(table)]
+
+def test_empty_table_inference_columns():
+    table = lab.CharacterTable.from_characters([])
+    columns = table.inference_columns()
+    assert len(table) == 0 and table.to_characters() == []
+    assert set(columns) == set(lab.RecommendationInferenceEngine.columns_from_characters([]))
+    assert all(len(values) == 0 for values in columns.values())
+    assert lab.RecommendationInferenceEngine().infer_algorithms_batch(columns).shape == (0, 4)
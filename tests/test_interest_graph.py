@@ -0,0 +1,23 @@
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+@pytest.fixture(scope="module")
+def graph():
+    return lab.InterestGraph.from_relations(lab.DEFAULT_INTEREST_RELATIONS)
+
+
+@pytest.mark.parametrize("interests, expected", [
+    (["technology"], ["programming", "gadgets", "AI"]),
+    (["foo"], ["foo"]),
+    (["foo", "technology"], ["foo", "programming", "gadgets"]),
+    (["technology", "foo"], ["programming", "foo", "gadgets"]),
+    (["foo", "bar", "baz", "qux"], ["foo", "bar", "baz"]),
+])
+def test_expand_keeps_unknown_interests_in_input_order(graph, interests, expected):
+    assert graph.expand(interests, limit=3) == expected
+
+def test_expand_excludes_own_interests(graph):
+    related = graph.expand(["technology", "programming"], limit=10)
+    assert "technology" not in related and "programming" not in related
@@ -0,0 +1,81 @@
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return lab.LocationResolver()
+
+
+@pytest.mark.parametrize("location, country", [
+    # Country names and aliases
+    ("New York, USA", "us"),
+    ("London, UK", "gb"),
+    ("somewhere in the u.s.a.", "us"),
+    ("Dubai, UAE", "ae"),
+    ("kyoto japan", "jp"),
+    # Cities and subdivisions on their own
+    ("Mumbai", "in"),
+    ("AMSTERDAM!!", "nl"),
+    ("São Paulo", "br"),
+    ("Zürich", "ch"),
+    ("Rio de Janeiro", "br"),
+    # A name inside a longer one belongs to the longer one
+    ("Albuquerque, New Mexico", "us"),
+    ("Sydney, New South Wales", "au"),
+    ("Belfast, Northern Ireland", "gb"),
+    ("Mexico City", "mx"),
+    # A country or subdivision outranks a city of the same name elsewhere
+    ("Paris, Texas", "us"),
+    ("Paris", "fr"),
+    ("Victoria, British Columbia", "ca"),
+    ("Toronto, North America", "ca"),
+    # Blocked names shadow the table names they contain
+    ("South America", None),
+    ("Latin America", None),
+    ("Central America", None),
+    ("New England", None),
+    ("Boston, New England", "us"),
+    ("North Korea", None),
+    ("Seoul, Korea", "kr"),
+    ("Rio Grande Valley", None),
+    # Common words only count when capitalized
+    ("somewhere nice", None),
+    ("Nice, France", "fr"),
+    ("Nice", "fr"),
+    ("cork board factory", None),
+    ("Cork", "ie"),
+    # Nothing recognizable
+    ("Not specified", None),
+    ("", None),
+])
+def test_resolve(resolver, location, country):
+    resolved = resolver.resolve(location)
+    assert (resolved.country if resolved else None) == country
+
+def test_country_falls_back_to_default(resolver):
+    assert resolver.country("South America") == "us"
+    assert resolver.country("Latin America", default="br") == "br"
+    assert resolver.country("") == "us"
+
+def test_region_is_resolved(resolver):
+    assert resolver.resolve("Cape Town").region == "MEA"
+    assert resolver.resolve("Toronto").region == "NA"
+
+def test_results_are_memoized(resolver):
+    resolver.resolve("Berlin, Germany")
+    hits = resolver.stats()["cache_hits"]
+    resolver.resolve("Berlin, Germany")
+    assert resolver.stats()["cache_hits"] == hits + 1
+
+def test_custom_table_and_first_definition_wins():
+    resolver = lab.LocationResolver({"xa": ("R1", ("Alpha",), (), ("Springfield",)),
+                                     "xb": ("R2", ("Beta",), (), ("Springfield",))}, blocked=(), common_words=())
+    assert resolver.country("Springfield") == "xa"
+    assert resolver.country("Springfield, Beta") == "xb"
+
+def test_news_client_uses_resolver():
+    client = lab.NewsAPIClient("")
+    assert client.country_for_location("Melbourne, Victoria") == "au"
+    assert client.country_for_location("Latin America") == "us"
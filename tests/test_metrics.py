@@ -0,0 +1,50 @@
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+@pytest.fixture
+def registry():
+    registry = lab.enable_metrics()
+    yield registry
+    lab.set_metrics_sink(None)
+
+
+def test_disabled_sink_records_nothing():
+    lab.set_metrics_sink(None)
+    assert lab.span("anything") is lab.span("else")  # The shared no-op
+    lab.count("anything")
+    assert not lab.get_metrics_sink().enabled
+
+def test_spans_label_outcome(registry):
+    with lab.span("work_seconds", stage="a"):
+        pass
+    with pytest.raises(RuntimeError):
+        with lab.span("work_seconds", stage="a"):
+            raise RuntimeError
+    histograms = registry.snapshot()["histograms"]["work_seconds"]
+    assert histograms['{stage="a",outcome="ok"}']["count"] == 1
+    assert histograms['{stage="a",outcome="error"}']["count"] == 1
+
+def test_counters_by_label(registry):
+    lab.count("lookups_total", result="hit")
+    lab.count("lookups_total", 2, result="hit")
+    lab.count("lookups_total", result="miss")
+    assert registry.counter("lookups_total", result="hit") == 3
+    assert registry.counter("lookups_total", result="miss") == 1
+
+def test_prometheus_histogram_is_cumulative():
+    registry = lab.MetricsRegistry(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        registry.observe("latency_seconds", value)
+    text = registry.to_prometheus()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+
+def test_instrumented_cache_lookups(registry):
+    cache = lab.ResponseCache()
+    key = lab.ResponseCache.make_key("client", "endpoint", "http://upstream", {})
+    cache.get(key)
+    assert registry.counter("cache_lookups_total", result="miss") == 1
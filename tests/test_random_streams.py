@@ -0,0 +1,37 @@
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+def draws(stream, n=5):
+    rng = stream.python()
+    return [rng.random() for _ in range(n)]
+
+
+def test_same_seed_and_key_give_the_same_stream():
+    assert draws(lab.RandomStreams(42).child(3, 1)) == draws(lab.RandomStreams(42).child(3).child(1))
+    assert draws(lab.RandomStreams(42).spawn(4)[2]) == draws(lab.RandomStreams(42).child(2))
+
+def test_child_does_not_depend_on_call_order():
+    root = lab.RandomStreams(42)
+    first = draws(root.child(7))
+    for i in range(20):
+        root.child(i).python().random()
+    assert draws(root.child(7)) == first
+
+def test_different_keys_and_seeds_give_different_streams():
+    root = lab.RandomStreams(42)
+    streams = [draws(root.child(i)) for i in range(50)] + [draws(root), draws(lab.RandomStreams(43).child(0))]
+    assert len({tuple(stream) for stream in streams}) == len(streams)
+
+def test_unseeded_root_keeps_its_seed_for_replay():
+    root = lab.RandomStreams()
+    assert draws(lab.RandomStreams(root.seed).child(1)) == draws(root.child(1))
+
+@pytest.mark.skipif(lab.np is None, reason="NumPy streams")
+def test_numpy_children_are_independent():
+    root = lab.RandomStreams(42)
+    assert (root.child(1).numpy().random(4) == root.child(1).numpy().random(4)).all()
+    samples = lab.np.stack([root.child(i).numpy().standard_normal(20_000) for i in range(4)])
+    correlation = lab.np.corrcoef(samples)
+    assert lab.np.abs(correlation[~lab.np.eye(4, dtype=bool)]).max() < 0.05
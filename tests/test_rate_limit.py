@@ -0,0 +1,42 @@
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_is_free_then_callers_queue():
+    bucket = lab.TokenBucket(rate=2.0, capacity=3, clock=FakeClock())
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Each queued caller waits for its own share of refill
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.5, 1.0, 1.5])
+
+def test_bucket_refills_at_rate_up_to_capacity():
+    clock = FakeClock()
+    bucket = lab.TokenBucket(rate=2.0, capacity=3, clock=clock)
+    for _ in range(3):
+        bucket.reserve()
+    clock.now += 1.0
+    assert [bucket.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.5)
+    # A long idle period refills only to the burst size
+    clock.now += 100.0
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() > 0
+
+def test_limiter_budgets_hosts_separately_and_counts_waits(monkeypatch):
+    monkeypatch.setattr(lab.time, "sleep", lambda seconds: None)
+    limiter = lab.RateLimiter({"a.test": (1.0, 1)}, clock=FakeClock())
+    assert limiter.acquire("a.test") == 0.0
+    assert limiter.acquire("a.test") == pytest.approx(1.0)
+    assert limiter.acquire("unlimited.test") == 0.0
+    stats = limiter.stats()
+    assert stats["a.test"]["requests"] == 2 and stats["a.test"]["delayed"] == 1
+    assert stats["a.test"]["max_wait"] == pytest.approx(1.0)
+    assert "unlimited.test" not in stats
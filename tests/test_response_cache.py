@@ -0,0 +1,88 @@
+import RecommenderLab_Cl as lab
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_entry_expires_after_its_endpoint_ttl():
+    clock = FakeClock()
+    cache = lab.ResponseCache(ttls={"hot": 10}, default_ttl=60, clock=clock)
+    cache.set(("hot",), {"v": 1}, "hot")
+    cache.set(("other",), {"v": 2}, "other")
+    clock.now += 9
+    assert cache.get(("hot",)) == {"v": 1}
+    clock.now += 2
+    assert cache.get(("hot",)) is None
+    assert cache.get(("other",)) == {"v": 2}
+    # Expired entries stay available for the stale fallback until evicted
+    assert cache.get_stale(("hot",)) == {"v": 1}
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1 and stats["expirations"] == 1
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = lab.ResponseCache(max_entries=2, clock=FakeClock())
+    cache.set("a", 1, "hot")
+    cache.set("b", 2, "hot")
+    assert cache.get("a") == 1
+    cache.set("c", 3, "hot")
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_byte_bound_evicts_and_oversized_values_are_not_stored():
+    cache = lab.ResponseCache(max_bytes=10, clock=FakeClock())
+    cache.set("a", "x", "hot", size=6)
+    cache.set("b", "y", "hot", size=6)
+    assert cache.get("a") is None and cache.get("b") == "y"
+    cache.set("c", "z", "hot", size=11)
+    assert cache.get("c") is None
+    assert cache.stats()["bytes"] == 6
+
+
+def make_backend(path, clock):
+    return lab.SQLiteCacheBackend(str(path), compact_interval=0, clock=clock)
+
+def test_memory_miss_falls_back_to_sqlite(tmp_path):
+    clock = FakeClock()
+    path = tmp_path / "cache.db"
+    writer = lab.ResponseCache(ttls={"hot": 10}, backend=make_backend(path, clock), clock=clock)
+    writer.set(("hot", "q"), {"v": 1}, "hot")
+    writer.backend.close()
+
+    # A fresh process: empty memory tier over the same database
+    reader = lab.ResponseCache(backend=make_backend(path, clock), clock=clock)
+    assert reader.get(("hot", "q")) == {"v": 1}
+    assert reader.get(("hot", "q")) == {"v": 1}
+    stats = reader.stats()
+    assert stats["disk_hits"] == 1 and stats["hits"] == 2 and stats["entries"] == 1
+    reader.backend.close()
+
+def test_sqlite_entries_expire_and_compact(tmp_path):
+    clock = FakeClock()
+    backend = make_backend(tmp_path / "cache.db", clock)
+    cache = lab.ResponseCache(ttls={"hot": 10, "everything": 600}, backend=backend, clock=clock)
+    cache.set(("hot",), 1, "hot")
+    cache.set(("everything",), 2, "everything")
+    clock.now += 11
+    cache.clear()
+    assert cache.get(("hot",)) is None
+    assert cache.get(("everything",)) == 2
+    assert backend.compact() == 1
+    backend.close()
+
+def test_backend_errors_degrade_to_memory_only(tmp_path, capsys):
+    clock = FakeClock()
+    backend = make_backend(tmp_path / "cache.db", clock)
+    cache = lab.ResponseCache(backend=backend, clock=clock)
+    backend._connection().execute("DROP TABLE responses")
+    cache.set("a", 1, "hot")
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    out = capsys.readouterr().out
+    assert "Persistent cache write failed" in out and "Persistent cache read failed" in out
+    backend.close()
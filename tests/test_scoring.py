@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+def rec(title, score=0.5, algorithm="Content-Based"):
+    return lab.Recommendation(title=title, source="NewsAPI - Test", url=f"https://example.com/{title}",
+                              algorithm=algorithm, score=score, description="")
+
+def make_recommender(branches, scorer=None):
+    recommender = lab.ContentRecommender("", rng=random.Random(0))
+    recommender.scorer = scorer
+    recommender._feed_tasks = lambda character, items, rng: [
+        ("content_based", lambda character, limit, recs=recs: list(recs), len(recs)) for recs in branches]
+    return recommender
+
+@pytest.fixture
+def character():
+    character = lab.generate_population(1, seed=0)[0]
+    character.interests = ["technology"]
+    return character
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_higher_score_survives_truncation(character, seed):
+    recommender = make_recommender([[rec("low one", 0.1), rec("high one", 0.9), rec("mid one", 0.5)]])
+    feed = recommender.generate_feed(character, {"content_based": 1.0}, 2, rng=random.Random(seed))
+    recommender.close()
+    assert [r.title for r in feed] == ["high one", "mid one"]
+
+def test_budgeted_feed_is_ranked(character):
+    recommender = make_recommender([[rec("low one", 0.1)], [rec("high one", 0.9)]])
+    result = recommender.generate_feed_result(character, {"content_based": 1.0}, 1, budget=5.0)
+    recommender.close()
+    assert [r.title for r in result.recommendations] == ["high one"]
+
+def test_streamed_quota_takes_best_of_source(character):
+    recommender = make_recommender([[rec("low one", 0.1), rec("high one", 0.9)]])
+    recommender._items_per_algorithm = lambda weights, total: {"content_based": 1}
+    feed = list(recommender.iter_feed(character, {"content_based": 1.0}, 1))
+    recommender.close()
+    assert [r.title for r in feed] == ["high one"]
+
+@pytest.mark.skipif(lab.np is None, reason="ContentScorer needs NumPy")
+def test_relevant_item_outranks_irrelevant(character):
+    candidates = [rec("Spring gardening tips for tomatoes"), rec("New technology chips announced")]
+    recommender = make_recommender([candidates], scorer=lab.ContentScorer())
+    feed = recommender.generate_feed(character, {"content_based": 1.0}, 1)
+    recommender.close()
+    assert feed[0].title == "New technology chips announced"
+    low, high = lab.SCORE_RANGES["Content-Based"]
+    assert low <= candidates[0].score < candidates[1].score <= high
+
+@pytest.mark.skipif(lab.np is None, reason="ContentScorer needs NumPy")
+def test_similarity_bounds():
+    scorer = lab.ContentScorer()
+    similarity = scorer.similarities("rust compilers", ["rust compilers", "baking bread", ""])
+    assert similarity[0] == pytest.approx(1.0)
+    assert similarity[1] == 0.0
+    assert similarity[2] == 0.0
+
+@pytest.mark.skipif(lab.np is None, reason="ContentScorer needs NumPy")
+def test_frozen_scores_do_not_depend_on_order():
+    batches = [["rust compilers are fast", "python packaging"], ["rust borrow checker", "baking bread"]]
+    results = []
+    for order in (batches, batches[::-1]):
+        scorer = lab.ContentScorer()
+        with scorer.frozen():
+            scores = {tuple(texts): scorer.similarities("rust", texts).tolist() for texts in order}
+        results.append(scores)
+        assert scorer.documents == 4
+    assert results[0] == results[1]
+
+@pytest.mark.skipif(lab.np is None, reason="ContentScorer needs NumPy")
+def test_frozen_without_commit_leaves_corpus_unchanged():
+    scorer = lab.ContentScorer()
+    scorer.similarities("rust", ["rust compilers"])
+    before = scorer.similarities("rust", ["rust borrow checker"], update=False)
+    with scorer.frozen(commit=False):
+        scorer.similarities("rust", ["rust everywhere", "rust again"])
+    assert scorer.documents == 1
+    assert scorer.similarities("rust", ["rust borrow checker"], update=False).tolist() == before.tolist()
+
+def test_weights_decide_the_mix_across_score_bands(character):
+    popular = [rec(f"popular {i}", 0.8 + i / 100, "Popularity/Trending") for i in range(5)]
+    collaborative = [rec(f"liked {i}", 0.6 + i / 100, "Collaborative") for i in range(5)]
+    recommender = make_recommender([])
+    recommender._feed_tasks = lambda character, items, rng: [
+        ("popularity", lambda character, limit: list(popular), 5),
+        ("collaborative", lambda character, limit: list(collaborative), 5)]
+    weights = {"content_based": 0.0, "collaborative": 0.6, "popularity": 0.4, "demographic": 0.0}
+    feed = recommender.generate_feed(character, weights, 5)
+    result = recommender.generate_feed_result(character, weights, 5, budget=5.0)
+    recommender.close()
+    for recommendations in (feed, result.recommendations):
+        assert [r.algorithm for r in recommendations].count("Collaborative") == 3
+        assert recommendations[0].title == "popular 4"
@@ -0,0 +1,37 @@
+import json
+from dataclasses import asdict
+
+import pytest
+
+import RecommenderLab_Cl as lab
+
+
+@pytest.fixture(scope="module")
+def config():
+    with lab.StubAPIServer(latency_ms=0, latency_distribution="fixed") as server:
+        yield lab.SimulationConfig(api_key="test-key", news_base_url=server.news_base_url,
+                                   reddit_base_url=server.reddit_base_url, total_items=5, seed=1, threads=2)
+
+def records(size):
+    return [(i + 1, asdict(character)) for i, character in enumerate(lab.iter_population(size, seed=4))]
+
+def output_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["line"] for line in f]
+
+
+def test_shards_are_written_in_input_order(config, tmp_path):
+    runner = lab.PopulationRunner(config, workers=3, shard_size=4, progress=False)
+    summary = runner.run(records(40), str(tmp_path / "out.jsonl"))
+    assert output_lines(tmp_path / "out.jsonl") == list(range(1, 41))
+    assert summary.characters == 40
+
+def test_resumed_run_matches_uninterrupted_order(config, tmp_path):
+    output, checkpoint = str(tmp_path / "out.jsonl"), str(tmp_path / "out.checkpoint.json")
+    # The first run stops after 3 of the 6 shards
+    lab.PopulationRunner(config, workers=2, shard_size=5, checkpoint_path=checkpoint,
+                         progress=False).run(records(15), output)
+    summary = lab.PopulationRunner(config, workers=2, shard_size=5, checkpoint_path=checkpoint,
+                                   progress=False).run(records(30), output, resume=True)
+    assert output_lines(output) == list(range(1, 31))
+    assert summary.characters == 30
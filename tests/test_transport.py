@@ -0,0 +1,62 @@
+import io
+
+import pytest
+import requests
+
+import RecommenderLab_Cl as lab
+
+
+class ScriptedSession:
+    """Answers GETs with a fixed sequence of (status, headers)"""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        status, headers = self.answers[self.calls]
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = b"{}"
+        response.raw = io.BytesIO(b"{}")
+        return response
+
+
+def make_transport(answers, **kwargs):
+    limiter = lab.RateLimiter({"api.test": (1000.0, 100)})
+    transport = lab.HTTPTransport(rate_limiter=limiter, backoff_factor=0.0, **kwargs)
+    session = ScriptedSession(answers)
+    transport._sessions["api.test"] = session
+    return transport, limiter, session
+
+def test_every_retry_takes_a_rate_limiter_token():
+    transport, limiter, session = make_transport([(503, {}), (500, {}), (200, {})])
+    assert transport.get("https://api.test/x").status_code == 200
+    assert session.calls == 3
+    assert limiter.stats()["api.test"]["requests"] == 3
+
+def test_429_waits_for_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(lab.time, "sleep", sleeps.append)
+    transport, limiter, session = make_transport([(429, {"Retry-After": "2"}), (200, {})])
+    assert transport.get("https://api.test/x").status_code == 200
+    assert sleeps == [2]
+    assert limiter.stats()["api.test"]["requests"] == 2
+    assert lab.RATE_LIMIT_WAIT.get() == pytest.approx(2)
+
+def test_429_beyond_max_retry_after_is_handed_back():
+    transport, _, session = make_transport([(429, {"Retry-After": "120"})], max_retry_after=30)
+    assert transport.get("https://api.test/x").status_code == 429
+    assert session.calls == 1
+
+def test_retries_stop_after_max_retries():
+    transport, _, session = make_transport([(503, {})] * 5, max_retries=2)
+    assert transport.get("https://api.test/x").status_code == 503
+    assert session.calls == 3
+
+def test_adapter_does_not_retry_statuses():
+    retry = lab.HTTPTransport().retry
+    assert not retry.is_retry("GET", 429, has_retry_after=True)
+    assert not retry.is_retry("GET", 503)